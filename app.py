@@ -6,6 +6,7 @@ from routes.campaigns import campaigns_bp
 from routes.generation import generation_bp
 from routes.instagram import instagram_bp
 from routes.media import media_bp
+from routes.jobs import jobs_bp
 
 load_dotenv()
 
@@ -15,6 +16,7 @@ app.register_blueprint(campaigns_bp)
 app.register_blueprint(generation_bp)
 app.register_blueprint(instagram_bp)
 app.register_blueprint(media_bp)
+app.register_blueprint(jobs_bp)
 
 
 @app.route('/')
@@ -0,0 +1,143 @@
+"""
+Batch poster rendering.
+
+Renders many posters in parallel on a process pool, e.g. to re-render the
+whole campaign catalogue after a branding change. Each worker pre-loads
+fonts and gradient overlays once and decodes its images serially (the
+process pool already uses every core), and results are yielded as soon as each
+poster finishes.
+
+CLI:
+    python batch.py jobs.json --out-dir posters/ [--workers 4]
+
+jobs.json is a list of objects:
+    {"name": "spa", "images": ["a.jpg", "b.jpg"], "title": "...",
+     "discount": "%30", "layout": "multiple", "title_y_percent": 60}
+"""
+
+import os
+import sys
+import json
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from poster import create_poster, create_poster_from_multiple, warm_caches
+from layout import set_decode_workers
+
+LAYOUTS = ("single", "multiple")
+
+
+def render_job(job):
+    """
+    Render one poster job.
+
+    Args:
+        job: dict with images (list of bytes), title, discount and optional
+             layout ("single" / "multiple") and title_y_percent.
+             Without a layout, 1 image -> single, more -> multiple.
+
+    Returns:
+        bytes: JPEG poster
+    """
+    images = job["images"]
+    if not images:
+        raise ValueError("Job has no images")
+
+    layout = job.get("layout") or ("single" if len(images) == 1 else "multiple")
+    if layout not in LAYOUTS:
+        raise ValueError(f"Unknown layout: {layout}")
+
+    kwargs = {}
+    if job.get("title_y_percent") is not None:
+        kwargs["title_y_percent"] = job["title_y_percent"]
+
+    if layout == "single":
+        return create_poster(images[0], job["title"], job["discount"], **kwargs)
+    return create_poster_from_multiple(images, job["title"], job["discount"], **kwargs)
+
+
+def _render_indexed(index, job):
+    """Worker entry point: never raises, so one bad job doesn't stop the batch."""
+    try:
+        return {"index": index, "poster_bytes": render_job(job), "error": None}
+    except Exception as e:
+        return {"index": index, "poster_bytes": None, "error": str(e)}
+
+
+def _init_worker():
+    """Process pool initializer: one process per core already, so decode serially."""
+    set_decode_workers(1)
+    warm_caches()
+
+
+def render_posters_batch(jobs, max_workers=None):
+    """
+    Render poster jobs on a process pool, yielding results as they finish.
+
+    Args:
+        jobs: Iterable of job dicts (see render_job)
+        max_workers: Worker process count (default: CPU count)
+
+    Yields:
+        dict: {"index": job index, "poster_bytes": bytes or None, "error": str or None}
+              in completion order, not submission order.
+    """
+    jobs = list(jobs)
+    if not jobs:
+        return
+
+    max_workers = min(max_workers or os.cpu_count() or 1, len(jobs))
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker) as executor:
+        futures = [executor.submit(_render_indexed, i, job) for i, job in enumerate(jobs)]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def load_jobs(jobs_path):
+    """Read a jobs JSON file and load image paths (relative to the file) as bytes."""
+    base_dir = os.path.dirname(os.path.abspath(jobs_path))
+    with open(jobs_path, "r", encoding="utf-8") as f:
+        specs = json.load(f)
+
+    jobs = []
+    for spec in specs:
+        job = dict(spec)
+        images = []
+        for path in spec.get("images", []):
+            with open(os.path.join(base_dir, path), "rb") as img_file:
+                images.append(img_file.read())
+        job["images"] = images
+        jobs.append(job)
+    return jobs
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render many posters in parallel.")
+    parser.add_argument("jobs", help="Path to jobs JSON file")
+    parser.add_argument("--out-dir", default="posters", help="Output directory")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    args = parser.parse_args(argv)
+
+    jobs = load_jobs(args.jobs)
+    os.makedirs(args.out_dir, exist_ok=True)
+
+    failed = 0
+    for done, result in enumerate(render_posters_batch(jobs, args.workers), start=1):
+        job = jobs[result["index"]]
+        name = job.get("name") or f"poster_{result['index'] + 1}"
+        if result["error"]:
+            failed += 1
+            print(f"[{done}/{len(jobs)}] {name}: ERROR {result['error']}")
+            continue
+        out_path = os.path.join(args.out_dir, f"{name}.jpg")
+        with open(out_path, "wb") as f:
+            f.write(result["poster_bytes"])
+        print(f"[{done}/{len(jobs)}] {name}: {out_path}")
+
+    if failed:
+        print(f"{failed} of {len(jobs)} posters failed.")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,311 @@
+"""
+Rendering micro-benchmarks for poster.py and collage.py.
+
+Every public render function is run on deterministic synthetic JPEGs across
+image counts (1-10), collage layouts and source resolutions. Each case
+runs in a fresh Python subprocess, which records the best-of-N wall time
+(as timeit does; the least noisy estimate on a busy machine) and its own
+peak RSS (VmHWM, or ru_maxrss where /proc is not available), so Pillow's
+pixel buffers count and earlier cases do not. One extra render runs under
+tracemalloc for the Python-level allocations (encoded bytes, buffers,
+layout data; Pillow's pixel storage is not traced): the traced peak and
+the total still allocated when the render returns, result included (the
+sum of a tracemalloc snapshot). Source images are generated
+once by the parent and read from a temp directory, so generating them does
+not count towards the peak. Works offline: no network calls, and missing fonts fall back via
+poster._load_font. The render cache is disabled so every repeat really
+renders.
+
+CLI (from the repo root):
+    python benchmarks/bench_render.py run --out results.json [--repeat 5] [--filter collage/]
+    python benchmarks/bench_render.py compare results.json [--baseline benchmarks/baseline.json]
+                                              [--threshold 0.2] [--min-delta-ms 2]
+                                              [--min-delta-kb 256]
+
+compare exits with status 1 when any case is slower, or has a higher peak
+RSS, traced peak or traced total, than the baseline by more than threshold
+(relative). Wall-time deltas below --min-delta-ms and traced-memory deltas
+below --min-delta-kb are ignored as noise. Regenerate the baseline on the
+machine that runs the gate:
+    python benchmarks/bench_render.py run --out benchmarks/baseline.json
+"""
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import resource
+import tempfile
+import statistics
+import tracemalloc
+import subprocess
+from io import BytesIO
+
+# Benchmark the renderers, not the render cache
+os.environ["RENDER_CACHE_DIR"] = ""
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image, ImageDraw
+
+import poster
+import collage
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+IMAGE_COUNTS = range(1, 11)
+COLLAGE_LAYOUTS = ("feature", "full_bleed", "grid")
+# Source resolutions: small web image, typical scraped photo, 12MP phone photo
+RESOLUTIONS = {
+    "small": (640, 480),
+    "medium": (1600, 1200),
+    "large": (3024, 4032),
+}
+
+TITLE = "Spa & Masaj Paketi: Tüm Gün Havuz ve Sauna Kullanımı Dahil"
+DISCOUNT = "%45 İndirim"
+
+# Set by run() for the case subprocesses
+IMAGE_DIR_ENV = "BENCH_IMAGE_DIR"
+
+
+def synthetic_image(resolution, index):
+    """Deterministic textured JPEG (gradients + shapes), different per index."""
+    width, height = RESOLUTIONS[resolution]
+    base = Image.linear_gradient("L").resize((width, height))
+    radial = Image.radial_gradient("L").resize((width, height))
+    img = Image.merge("RGB", (
+        base.rotate(index * 36, expand=False),
+        radial,
+        base.transpose(Image.Transpose.FLIP_LEFT_RIGHT),
+    ))
+    draw = ImageDraw.Draw(img)
+    step = max(width, height) // 12
+    for i in range(12):
+        x = (i * 97 + index * 53) % width
+        y = (i * 61 + index * 29) % height
+        color = ((i * 40 + index * 20) % 256, (i * 90) % 256, (index * 70) % 256)
+        draw.ellipse((x, y, x + step, y + step), outline=color, width=max(1, step // 20))
+        draw.line((0, y, width, (y + i * step) % height), fill=color, width=2)
+    buf = BytesIO()
+    img.save(buf, format="JPEG", quality=90)
+    return buf.getvalue()
+
+
+def write_images(directory):
+    """Generate every source image once, as directory/<resolution>-<index>.jpg."""
+    for res in RESOLUTIONS:
+        for index in range(max(IMAGE_COUNTS)):
+            with open(os.path.join(directory, f"{res}-{index}.jpg"), "wb") as f:
+                f.write(synthetic_image(res, index))
+
+
+def read_images(res, count):
+    directory = os.environ[IMAGE_DIR_ENV]
+    images = []
+    for index in range(count):
+        with open(os.path.join(directory, f"{res}-{index}.jpg"), "rb") as f:
+            images.append(f.read())
+    return images
+
+
+def build_cases():
+    """{name: (function, resolution, image count, kwargs)} for every benchmark case."""
+    cases = {}
+    for res in RESOLUTIONS:
+        cases[f"poster/single/n1/{res}"] = ("poster_single", res, 1, {})
+        for count in IMAGE_COUNTS:
+            cases[f"poster/multiple/n{count}/{res}"] = ("poster_multiple", res, count, {})
+            if count <= 4:
+                cases[f"poster/raw_collage/n{count}/{res}"] = ("raw_collage", res, count, {})
+            for layout in COLLAGE_LAYOUTS:
+                cases[f"collage/{layout}/n{count}/{res}"] = ("collage", res, count, {"layout": layout})
+    return cases
+
+
+def case_callable(kind, res, count, kwargs):
+    """Load the case's source images and return the render call."""
+    imgs = read_images(res, count)
+    if kind == "poster_single":
+        return lambda: poster.create_poster(imgs[0], TITLE, DISCOUNT)
+    if kind == "poster_multiple":
+        return lambda: poster.create_poster_from_multiple(imgs, TITLE, DISCOUNT)
+    if kind == "raw_collage":
+        return lambda: poster.create_raw_collage(imgs)
+    return lambda: collage.create_collage(imgs, **kwargs)
+
+
+def _peak_rss_kb():
+    """Peak RSS of this process in KB."""
+    # VmHWM belongs to the current program image; ru_maxrss on Linux also
+    # carries over the high-water mark of the forked parent across exec
+    try:
+        with open("/proc/self/status", "r") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # bytes on macOS, KB on Linux
+    return rss // 1024 if platform.system() == "Darwin" else rss
+
+
+def _traced_allocations(fn):
+    """(peak, total) KB traced by tracemalloc during one fn() call."""
+    tracemalloc.start()
+    try:
+        result = fn()
+        _, peak = tracemalloc.get_traced_memory()
+        snapshot = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    del result
+    total = sum(stat.size for stat in snapshot.statistics("filename"))
+    return peak // 1024, total // 1024
+
+
+def measure(fn, repeat):
+    """Best and median wall time of fn(), its traced allocations and this process's peak RSS."""
+    fn()  # warm-up: fonts, gradients, layout plans
+
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+
+    # Traced separately: tracemalloc slows the timed runs down
+    alloc_peak_kb, alloc_total_kb = _traced_allocations(fn)
+
+    return {
+        "wall_ms": round(min(times) * 1000, 3),
+        "wall_median_ms": round(statistics.median(times) * 1000, 3),
+        "alloc_peak_kb": alloc_peak_kb,
+        "alloc_total_kb": alloc_total_kb,
+        "peak_rss_kb": _peak_rss_kb(),
+    }
+
+
+def run_case(name, repeat):
+    """Measure one case in this process (called in a fresh subprocess by run())."""
+    fn = case_callable(*build_cases()[name])
+    print(json.dumps(measure(fn, repeat)))
+
+
+def run(repeat=5, name_filter=None):
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="bench-images-") as image_dir:
+        write_images(image_dir)
+        env = dict(os.environ, **{IMAGE_DIR_ENV: image_dir})
+        for name in build_cases():
+            if name_filter and name_filter not in name:
+                continue
+            proc = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "case", name, "--repeat", str(repeat)],
+                env=env, capture_output=True, text=True, check=True,
+            )
+            results[name] = json.loads(proc.stdout.strip().splitlines()[-1])
+            r = results[name]
+            print(f"{name:40s} {r['wall_ms']:9.2f} ms {r['peak_rss_kb']:9d} KB peak rss"
+                  f" {r['alloc_peak_kb']:8d} KB traced peak {r['alloc_total_kb']:8d} KB traced total")
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "pillow": Image.__version__,
+            "machine": platform.machine(),
+            "system": platform.system(),
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+
+# Traced allocation metrics gated by compare, with their labels
+ALLOC_METRICS = {"alloc_peak_kb": "traced peak", "alloc_total_kb": "traced total"}
+
+
+def compare(baseline, current, threshold=0.2, min_delta_ms=2.0, min_delta_kb=256):
+    """
+    Compare two result files.
+
+    Returns:
+        list of regression messages (empty if none)
+    """
+    regressions = []
+    for name, cur in current["results"].items():
+        base = baseline["results"].get(name)
+        if base is None:
+            print(f"{name:40s} new case")
+            continue
+
+        wall_change = cur["wall_ms"] / base["wall_ms"] - 1 if base["wall_ms"] else 0.0
+        rss_change = cur["peak_rss_kb"] / base["peak_rss_kb"] - 1 if base.get("peak_rss_kb") else 0.0
+        print(f"{name:40s} wall {base['wall_ms']:9.2f} -> {cur['wall_ms']:9.2f} ms ({wall_change:+.1%})"
+              f"  rss {rss_change:+.1%}"
+              f"  traced {base.get('alloc_peak_kb', 0)} -> {cur.get('alloc_peak_kb', 0)} KB peak")
+
+        if wall_change > threshold and cur["wall_ms"] - base["wall_ms"] >= min_delta_ms:
+            regressions.append(f"{name}: wall time {wall_change:+.1%}")
+        if rss_change > threshold:
+            regressions.append(f"{name}: peak RSS {rss_change:+.1%}")
+
+        for metric, label in ALLOC_METRICS.items():
+            if not base.get(metric) or metric not in cur:
+                continue
+            change = cur[metric] / base[metric] - 1
+            if change > threshold and cur[metric] - base[metric] >= min_delta_kb:
+                regressions.append(f"{name}: {label} {change:+.1%}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rendering micro-benchmarks.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = sub.add_parser("run", help="Run the benchmarks")
+    run_parser.add_argument("--out", help="Write results JSON here")
+    run_parser.add_argument("--repeat", type=int, default=5, help="Timed runs per case (best is kept)")
+    run_parser.add_argument("--filter", help="Only run cases whose name contains this")
+
+    case_parser = sub.add_parser("case", help="Measure a single case in this process (used by run)")
+    case_parser.add_argument("name")
+    case_parser.add_argument("--repeat", type=int, default=5)
+
+    cmp_parser = sub.add_parser("compare", help="Compare results against the baseline")
+    cmp_parser.add_argument("results", help="Results JSON from 'run'")
+    cmp_parser.add_argument("--baseline", default=BASELINE_PATH, help="Baseline JSON")
+    cmp_parser.add_argument("--threshold", type=float, default=0.2, help="Allowed relative regression")
+    cmp_parser.add_argument("--min-delta-ms", type=float, default=2.0, help="Ignore smaller wall-time increases")
+    cmp_parser.add_argument("--min-delta-kb", type=int, default=256, help="Ignore smaller traced-memory increases")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "case":
+        run_case(args.name, args.repeat)
+        return
+
+    if args.command == "run":
+        report = run(args.repeat, args.filter)
+        if args.out:
+            with open(args.out, "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2, sort_keys=True)
+            print(f"Results written to {args.out}")
+        return
+
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    with open(args.results, "r", encoding="utf-8") as f:
+        current = json.load(f)
+
+    regressions = compare(baseline, current, args.threshold, args.min_delta_ms, args.min_delta_kb)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) over {args.threshold:.0%}:")
+        for message in regressions:
+            print(f"  {message}")
+        sys.exit(1)
+    print("\nNo regressions.")
+
+
+if __name__ == "__main__":
+    main()
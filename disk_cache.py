@@ -0,0 +1,150 @@
+"""
+Size-bounded on-disk key/value cache.
+
+Entries are plain files under directory/<2 hex chars>/<key>, written
+atomically (temp file + rename), so several processes can share one
+directory. Recency is tracked in the file's access time (set explicitly on
+every hit, independent of noatime mounts) and the write time is the mtime:
+
+- LRU eviction: when the total size exceeds max_bytes, the least recently
+  used entries are deleted until it fits again.
+- TTL: entries older than ttl seconds (since written) count as misses.
+
+    cache = DiskCache(".cache/renders", max_bytes=512 * 1024 * 1024)
+    data = cache.get(key)
+    if data is None:
+        cache.set(key, render())
+"""
+import os
+import json
+import time
+import threading
+import tempfile
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+
+class DiskCache:
+    def __init__(self, directory: str, max_bytes: int, ttl: Optional[float] = None):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._index: Optional[OrderedDict] = None  # key -> size, least recent first
+        self._total = 0
+        self._stats = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], key)
+
+    def _load_index(self):
+        """Scan the directory once per process, oldest access first."""
+        entries = []
+        if os.path.isdir(self.directory):
+            for root, _, files in os.walk(self.directory):
+                for name in files:
+                    if name.startswith("."):
+                        continue
+                    try:
+                        st = os.stat(os.path.join(root, name))
+                    except OSError:
+                        continue
+                    entries.append((st.st_atime, name, st.st_size))
+        entries.sort()
+        self._index = OrderedDict((name, size) for _, name, size in entries)
+        self._total = sum(self._index.values())
+
+    def _ensure_index(self):
+        if self._index is None:
+            self._load_index()
+
+    def _forget(self, key: str):
+        size = self._index.pop(key, None)
+        if size is not None:
+            self._total -= size
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Cached bytes for key, or None on miss / expiry."""
+        path = self._path(key)
+        with self._lock:
+            self._ensure_index()
+            try:
+                st = os.stat(path)
+                now = time.time()
+                if self.ttl is not None and now - st.st_mtime > self.ttl:
+                    os.remove(path)
+                    raise FileNotFoundError(path)
+                with open(path, "rb") as f:
+                    data = f.read()
+                os.utime(path, (now, st.st_mtime))
+            except OSError:
+                self._forget(key)
+                self._stats["misses"] += 1
+                return None
+
+            self._forget(key)
+            self._index[key] = len(data)
+            self._total += len(data)
+            self._stats["hits"] += 1
+            return data
+
+    def set(self, key: str, data: bytes):
+        """Store bytes for key and evict least recently used entries over max_bytes."""
+        if len(data) > self.max_bytes:
+            return
+        path = self._path(key)
+        with self._lock:
+            self._ensure_index()
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(data)
+                os.replace(tmp_path, path)
+            except OSError:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+
+            self._forget(key)
+            self._index[key] = len(data)
+            self._total += len(data)
+            self._stats["writes"] += 1
+            self._evict()
+
+    def get_json(self, key: str) -> Any:
+        data = self.get(key)
+        return None if data is None else json.loads(data)
+
+    def set_json(self, key: str, value: Any):
+        self.set(key, json.dumps(value).encode("utf-8"))
+
+    def delete(self, key: str):
+        with self._lock:
+            self._ensure_index()
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+            self._forget(key)
+
+    def _evict(self):
+        while self._total > self.max_bytes and self._index:
+            key, size = self._index.popitem(last=False)
+            self._total -= size
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+            self._stats["evictions"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """hits, misses, writes, evictions, entries, bytes, max_bytes"""
+        with self._lock:
+            self._ensure_index()
+            return {
+                **self._stats,
+                "entries": len(self._index),
+                "bytes": self._total,
+                "max_bytes": self.max_bytes,
+            }
@@ -0,0 +1,154 @@
+"""
+Output encoding for posters and collages.
+
+Renders are encoded through named presets instead of a fixed JPEG q95.
+A preset sets the format, the quality range, the chroma subsampling
+options in order of preference, and an optional byte budget. When the
+first encode is over budget, the encoder binary-searches for the highest
+quality that fits.
+
+    result = encode_image(img, "publish")
+    result.data, result.settings  # bytes, {"format": "JPEG", "quality": 90, ...}
+
+The chosen settings are logged (logger "encoder"): at DEBUG for every
+encode, at INFO when the quality or subsampling had to drop below the
+preset or the result is still over budget. Render functions expose them
+as fn.encoded(...).settings (see render_cache.cached_render).
+"""
+import logging
+from io import BytesIO
+from typing import Any, Dict, NamedTuple, Optional
+
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+# Instagram rejects JPEGs larger than 8MB
+INSTAGRAM_MAX_BYTES = 8 * 1024 * 1024
+
+ENCODE_PRESETS: Dict[str, Dict[str, Any]] = {
+    # Published / uploaded output
+    "publish": {
+        "format": "JPEG",
+        "quality": 90,
+        "min_quality": 60,
+        "subsampling": ("4:2:0",),
+        "max_bytes": INSTAGRAM_MAX_BYTES,
+    },
+    # Highest fidelity that still fits Instagram's limit
+    "high": {
+        "format": "JPEG",
+        "quality": 95,
+        "min_quality": 70,
+        "subsampling": ("4:4:4", "4:2:0"),
+        "max_bytes": INSTAGRAM_MAX_BYTES,
+    },
+    # Small UI previews
+    "preview": {
+        "format": "WEBP",
+        "quality": 80,
+        "min_quality": 40,
+        "subsampling": (None,),
+        "max_bytes": 200 * 1024,
+    },
+}
+
+MIME_TYPES = {"JPEG": "image/jpeg", "WEBP": "image/webp", "PNG": "image/png"}
+
+
+class EncodeResult(NamedTuple):
+    data: bytes
+    settings: Dict[str, Any]
+
+    @property
+    def mime_type(self) -> str:
+        return MIME_TYPES[self.settings["format"]]
+
+
+def preset_mime_type(preset: str) -> str:
+    """MIME type of the output of a preset, e.g. for data: URLs."""
+    return MIME_TYPES[ENCODE_PRESETS[preset]["format"]]
+
+
+def _encode(img: Image.Image, fmt: str, quality: int, subsampling: Optional[str]) -> bytes:
+    output = BytesIO()
+    if fmt == "JPEG":
+        img.save(output, format="JPEG", quality=quality, subsampling=subsampling,
+                 optimize=True, progressive=True)
+    elif fmt == "WEBP":
+        img.save(output, format="WEBP", quality=quality, method=4)
+    else:
+        img.save(output, format=fmt)
+    return output.getvalue()
+
+
+def encode_image(img: Image.Image, preset: str = "publish", max_bytes: Optional[int] = None) -> EncodeResult:
+    """
+    Encode an image with a named preset, staying under its byte budget if possible.
+
+    Args:
+        img: RGB image
+        preset: Key of ENCODE_PRESETS
+        max_bytes: Override the preset's byte budget (None keeps the preset's)
+
+    Returns:
+        EncodeResult: data and the chosen settings (format, quality,
+        subsampling, bytes, within_budget). If nothing fits, the smallest
+        attempt is returned with within_budget=False.
+    """
+    if preset not in ENCODE_PRESETS:
+        raise ValueError(f"Unknown encode preset: {preset}")
+    config = ENCODE_PRESETS[preset]
+    fmt = config["format"]
+    budget = max_bytes or config["max_bytes"]
+
+    smallest = None
+    for subsampling in config["subsampling"]:
+        data = _encode(img, fmt, config["quality"], subsampling)
+        if not budget or len(data) <= budget:
+            return _result(preset, data, _settings(fmt, config["quality"], subsampling, data, True))
+        if smallest is None or len(data) < len(smallest[1]):
+            smallest = (config["quality"], data, subsampling)
+
+        # Binary search for the highest quality under budget
+        best = None
+        low, high = config["min_quality"], config["quality"] - 1
+        while low <= high:
+            quality = (low + high) // 2
+            data = _encode(img, fmt, quality, subsampling)
+            if len(data) <= budget:
+                best = (quality, data)
+                low = quality + 1
+            else:
+                high = quality - 1
+                if smallest is None or len(data) < len(smallest[1]):
+                    smallest = (quality, data, subsampling)
+
+        if best:
+            quality, data = best
+            return _result(preset, data, _settings(fmt, quality, subsampling, data, True))
+
+    quality, data, subsampling = smallest
+    return _result(preset, data, _settings(fmt, quality, subsampling, data, False))
+
+
+def _result(preset, data, settings):
+    config = ENCODE_PRESETS[preset]
+    adjusted = settings["quality"] != config["quality"] or settings["subsampling"] != config["subsampling"][0]
+    level = logging.INFO if adjusted or not settings["within_budget"] else logging.DEBUG
+    if logger.isEnabledFor(level):
+        subsampling = f" {settings['subsampling']}" if settings["subsampling"] else ""
+        budget_note = "" if settings["within_budget"] else " (over budget)"
+        logger.log(level, "Encoded %s: %s q%s%s, %s bytes%s", preset, settings["format"],
+                   settings["quality"], subsampling, settings["bytes"], budget_note)
+    return EncodeResult(data, settings)
+
+
+def _settings(fmt, quality, subsampling, data, within_budget):
+    return {
+        "format": fmt,
+        "quality": quality,
+        "subsampling": subsampling,
+        "bytes": len(data),
+        "within_budget": within_budget,
+    }
@@ -0,0 +1,194 @@
+"""
+Shared image loading for poster.py and collage.py.
+
+Source images are decoded only as large as the cell they end up in:
+- JPEGs are decoded with draft() at the smallest DCT scale that still
+  covers the target size (1/2, 1/4, 1/8 of the original).
+- Other formats are shrunk with reduce() by an integer factor right after
+  decoding, before any alpha flattening or filtering.
+- The final resize is two-stage: a cheap box reduction to within
+  REDUCING_GAP of the target, then LANCZOS on the remaining pixels only.
+
+Images larger than MAX_IMAGE_PIXELS are rejected from the header, before
+any pixel data is decoded (decompression bomb protection).
+"""
+import os
+import math
+import hashlib
+import threading
+from io import BytesIO
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from PIL import Image
+
+# Largest accepted source image (width * height), checked before decoding
+MAX_IMAGE_PIXELS = int(os.getenv("MAX_IMAGE_PIXELS", "64000000"))
+
+# Fitted images kept for repeated preview renders (at most one cell/poster each)
+FITTED_CACHE_SIZE = 32
+
+# Two-stage resize: box-reduce until the image is at most this many times
+# larger than the target, then finish with LANCZOS
+REDUCING_GAP = 2.0
+
+
+class ImageTooLargeError(ValueError):
+    """Source image exceeds the pixel budget."""
+
+
+def open_image(data: bytes, max_pixels: Optional[int] = None) -> Image.Image:
+    """
+    Open an image lazily (header only) and enforce the pixel budget.
+
+    Raises:
+        ImageTooLargeError: if width * height exceeds max_pixels
+    """
+    max_pixels = max_pixels or MAX_IMAGE_PIXELS
+    img = Image.open(BytesIO(data))
+    if img.width * img.height > max_pixels:
+        raise ImageTooLargeError(
+            f"Image too large: {img.width}x{img.height} exceeds {max_pixels} pixels"
+        )
+    return img
+
+
+def _min_decode_size(size: Tuple[int, int], target_size: Tuple[int, int], crop: bool) -> Tuple[int, int]:
+    """Smallest decode size that still covers target_size (keeping aspect ratio when crop=True)."""
+    target_w, target_h = target_size
+    if not crop:
+        return target_w, target_h
+    scale = max(target_w / size[0], target_h / size[1])
+    return math.ceil(size[0] * scale), math.ceil(size[1] * scale)
+
+
+# Modes reduce() is applied to directly; others are converted first
+_REDUCE_MODES = ("L", "LA", "RGB", "RGBA")
+
+
+def _working_mode(img: Image.Image) -> str:
+    """RGBA for sources with transparency, RGB otherwise."""
+    if img.mode in ("LA", "PA", "La", "RGBa") or (img.mode == "P" and "transparency" in img.info):
+        return "RGBA"
+    return "RGB"
+
+
+def to_rgb(img: Image.Image) -> Image.Image:
+    """Convert to RGB, flattening transparency onto a white background."""
+    if img.mode in ('RGBA', 'P'):
+        if img.mode == 'P':
+            img = img.convert('RGBA')
+        bg = Image.new('RGB', img.size, (255, 255, 255))
+        if img.mode == 'RGBA':
+            bg.paste(img, mask=img.split()[3])
+        else:
+            bg.paste(img)
+        return bg
+    if img.mode != 'RGB':
+        return img.convert('RGB')
+    return img
+
+
+def load_image(
+    data: bytes,
+    target_size: Optional[Tuple[int, int]] = None,
+    crop: bool = True,
+    max_pixels: Optional[int] = None,
+    flatten: bool = True,
+) -> Image.Image:
+    """
+    Decode image bytes to RGB, no larger than needed for target_size.
+
+    Args:
+        data: Encoded image bytes
+        target_size: Final (width, height) the image will be fitted to.
+                     None decodes at full resolution.
+        crop: True if the image will be cropped to fill target_size (aspect
+              ratio kept), False if it will be stretched to it
+        max_pixels: Pixel budget (default MAX_IMAGE_PIXELS)
+        flatten: False keeps the alpha channel (RGBA) so it can be flattened
+                 with to_rgb() after resizing, on fewer pixels
+
+    Returns:
+        RGB (or RGBA when flatten=False) image at least as large as needed
+        to produce target_size
+    """
+    img = open_image(data, max_pixels)
+
+    if target_size:
+        min_size = _min_decode_size(img.size, target_size, crop)
+        if img.format == "JPEG":
+            img.draft(img.mode, min_size)
+        img.load()
+        factor = min(img.width // min_size[0], img.height // min_size[1])
+        if factor >= 2:
+            # reduce() rejects palette, 1-bit and 16-bit modes
+            if img.mode not in _REDUCE_MODES:
+                img = img.convert(_working_mode(img))
+            img = img.reduce(factor)
+
+    if flatten:
+        return to_rgb(img)
+    if img.mode == 'P':
+        return img.convert('RGBA')
+    if img.mode not in ('RGB', 'RGBA'):
+        return img.convert('RGB')
+    return img
+
+
+def crop_to_fill(img: Image.Image, target_width: int, target_height: int) -> Image.Image:
+    """
+    Resize and center-crop the image to exactly fill the target (no empty space).
+    Only the visible region is resampled.
+    """
+    scale = max(target_width / img.width, target_height / img.height)
+    # Clamp: float rounding must not push the box outside the image
+    box_w = min(target_width / scale, img.width)
+    box_h = min(target_height / scale, img.height)
+    left = max((img.width - box_w) / 2, 0)
+    top = max((img.height - box_h) / 2, 0)
+
+    return img.resize(
+        (target_width, target_height),
+        Image.Resampling.LANCZOS,
+        box=(left, top, left + box_w, top + box_h),
+        reducing_gap=REDUCING_GAP,
+    )
+
+
+def resize_to(img: Image.Image, size: Tuple[int, int]) -> Image.Image:
+    """Stretch the image to size using the two-stage resize."""
+    return img.resize(size, Image.Resampling.LANCZOS, reducing_gap=REDUCING_GAP)
+
+
+_fitted_cache = OrderedDict()
+_fitted_lock = threading.Lock()
+
+
+def load_fitted(data: bytes, size: Tuple[int, int], crop: bool = True, cache: bool = False) -> Image.Image:
+    """
+    Decode image bytes straight to exactly size (crop-to-fill, or stretch when crop=False).
+
+    With cache=True the result is kept in a small LRU keyed by content hash
+    and size, so repeated preview renders of the same sources skip decoding.
+    Cached images are shared: callers must not draw on them.
+    """
+    key = None
+    if cache:
+        key = (hashlib.sha1(data).digest(), tuple(size), crop)
+        with _fitted_lock:
+            if key in _fitted_cache:
+                _fitted_cache.move_to_end(key)
+                return _fitted_cache[key]
+
+    # Transparency is flattened after fitting, at cell size
+    img = load_image(data, size, crop, flatten=False)
+    img = crop_to_fill(img, *size) if crop else resize_to(img, size)
+    img = to_rgb(img)
+
+    if cache:
+        with _fitted_lock:
+            _fitted_cache[key] = img
+            while len(_fitted_cache) > FITTED_CACHE_SIZE:
+                _fitted_cache.popitem(last=False)
+    return img
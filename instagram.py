@@ -1,8 +1,9 @@
 import os
 import time
-import requests
 from typing import List, Dict
 
+from services import http_client
+
 
 def get_instagram_credentials():
     """Environment variable'lardan Instagram credentials al."""
@@ -40,7 +41,7 @@ def post_to_instagram(image_url: str, caption: str) -> dict:
     }
 
     print("Instagram'a yükleniyor...")
-    response = requests.post(container_url, data=payload, timeout=30)
+    response = http_client.post(container_url, data=payload, timeout=30)
     result = response.json()
 
     if 'id' not in result:
@@ -59,7 +60,7 @@ def post_to_instagram(image_url: str, caption: str) -> dict:
         'access_token': access_token
     }
 
-    publish_response = requests.post(publish_url, data=publish_payload, timeout=30)
+    publish_response = http_client.post(publish_url, data=publish_payload, timeout=30)
     publish_result = publish_response.json()
 
     if 'id' in publish_result:
@@ -87,7 +88,7 @@ def create_carousel_child_container(image_url: str, access_token: str, account_i
         'access_token': access_token
     }
 
-    response = requests.post(endpoint, data=payload, timeout=30)
+    response = http_client.post(endpoint, data=payload, timeout=30)
     result = response.json()
 
     if 'id' not in result:
@@ -122,7 +123,7 @@ def create_carousel_parent_container(
         'access_token': access_token
     }
 
-    response = requests.post(endpoint, data=payload, timeout=30)
+    response = http_client.post(endpoint, data=payload, timeout=30)
     result = response.json()
 
     if 'id' not in result:
@@ -149,7 +150,7 @@ def publish_media(creation_id: str, access_token: str, account_id: str) -> str:
         'access_token': access_token
     }
 
-    response = requests.post(endpoint, data=payload, timeout=30)
+    response = http_client.post(endpoint, data=payload, timeout=30)
     result = response.json()
 
     if 'id' not in result:
@@ -0,0 +1,261 @@
+"""
+Layout engine for collages and posters.
+
+A layout compiles (layout name, image count, output size, gap) into a
+tuple of cell rectangles. Plans are pure and memoized, so renderers only
+walk the cells: each source image is decoded, cropped and pasted once,
+straight at its cell size.
+
+New layouts are added with @register_layout("name").
+"""
+import os
+import math
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from PIL import Image
+
+from image_loader import load_fitted, crop_to_fill
+
+# Preview renders use the same layout math at this fraction of the output size
+PREVIEW_SCALE = 0.5
+
+# Threads decoding and cropping cells in parallel (Pillow releases the GIL
+# while decoding and resampling). 1 disables the pool.
+DECODE_WORKERS = int(os.getenv("DECODE_WORKERS", str(os.cpu_count() or 1)))
+
+
+def _create_decode_pool(workers: int) -> Optional[ThreadPoolExecutor]:
+    # Threads are only started on first use
+    return ThreadPoolExecutor(max_workers=workers, thread_name_prefix="decode") if workers > 1 else None
+
+
+_decode_pool = _create_decode_pool(DECODE_WORKERS)
+
+
+def set_decode_workers(workers: int):
+    """
+    Resize the decode pool (1 = decode serially on the calling thread).
+    Process pool workers (batch.py) call this with 1 so N processes do not
+    each start CPU-count decode threads.
+    """
+    global _decode_pool
+    old = _decode_pool
+    _decode_pool = _create_decode_pool(workers)
+    if old is not None:
+        old.shutdown(wait=False)
+
+
+class Cell(NamedTuple):
+    x: int
+    y: int
+    width: int
+    height: int
+
+
+LAYOUTS: Dict[str, Callable[[int, Tuple[int, int], int], List[Cell]]] = {}
+
+
+def scale_px(value: int, scale: float) -> int:
+    """Scale a pixel measure (size, gap, offset) for a scaled render; non-zero values stay >= 1px."""
+    return max(1, round(value * scale)) if value else 0
+
+
+def scaled_size(size: Tuple[int, int], scale: float) -> Tuple[int, int]:
+    return scale_px(size[0], scale), scale_px(size[1], scale)
+
+
+def register_layout(name: str):
+    """Register a plan function: fn(count, size, gap) -> list of Cells."""
+    def decorator(fn):
+        LAYOUTS[name] = fn
+        return fn
+    return decorator
+
+
+@lru_cache(maxsize=256)
+def _plan(name: str, count: int, size: Tuple[int, int], gap: int) -> Tuple[Cell, ...]:
+    return tuple(LAYOUTS[name](count, size, gap))
+
+
+def plan_layout(name: str, count: int, size: Tuple[int, int], gap: int) -> Tuple[Cell, ...]:
+    """
+    Compile a layout into cell rectangles (memoized).
+
+    Args:
+        name: Registered layout name ("poster", "feature", "full_bleed", "grid")
+        count: Number of images
+        size: Area to fill (width, height)
+        gap: Space between cells in px
+
+    Returns:
+        Tuple of Cells, in image order. May hold fewer cells than images
+        when a layout only shows the first N.
+    """
+    if name not in LAYOUTS:
+        raise ValueError(f"Unknown layout: {name}")
+    return _plan(name, count, tuple(size), gap)
+
+
+def fit_cells(
+    image_data_list: List[bytes],
+    cells: Tuple[Cell, ...],
+    cache: bool = False,
+    return_exceptions: bool = False,
+) -> list:
+    """
+    Decode each image at its cell size and crop to fill, concurrently on a
+    shared thread pool. Images without a cell are not decoded at all.
+
+    Args:
+        return_exceptions: Put the decode error in place of a failed cell
+                           instead of raising it
+
+    Returns:
+        Fitted images (or exceptions), one per cell, in cell order
+    """
+    pairs = list(zip(image_data_list, cells))
+
+    def fit(pair):
+        img_bytes, cell = pair
+        try:
+            return load_fitted(img_bytes, (cell.width, cell.height), cache=cache)
+        except Exception as e:
+            if return_exceptions:
+                return e
+            raise
+
+    if len(pairs) > 1 and _decode_pool is not None:
+        return list(_decode_pool.map(fit, pairs))
+    return [fit(pair) for pair in pairs]
+
+
+def compose_layout(
+    canvas: Image.Image,
+    image_data_list: List[bytes],
+    cells: Tuple[Cell, ...],
+    offset: Optional[Tuple[int, int]] = None,
+    cache: bool = False,
+) -> Image.Image:
+    """
+    Decode each image at its cell size, crop to fill and paste onto canvas.
+    Images without a cell are not decoded at all. cache=True keeps the
+    fitted cells for repeated (preview) renders.
+
+    Cells are decoded and cropped concurrently (fit_cells), then pasted in
+    order on the calling thread.
+    """
+    return paste_fitted(canvas, fit_cells(image_data_list, cells, cache=cache), cells, offset)
+
+
+def paste_fitted(
+    canvas: Image.Image,
+    images: List[Image.Image],
+    cells: Tuple[Cell, ...],
+    offset: Optional[Tuple[int, int]] = None,
+) -> Image.Image:
+    """Paste images already fitted to their cells (fit_cells) onto canvas."""
+    dx, dy = offset or (0, 0)
+    for img, cell in zip(images, cells):
+        canvas.paste(img, (cell.x + dx, cell.y + dy))
+    return canvas
+
+
+def paste_layout(canvas: Image.Image, images: List[Image.Image], cells: Tuple[Cell, ...]) -> Image.Image:
+    """Crop already decoded images to their cells and paste onto canvas."""
+    for img, cell in zip(images, cells):
+        canvas.paste(crop_to_fill(img, cell.width, cell.height), (cell.x, cell.y))
+    return canvas
+
+
+def _grid_cells(count, cols, rows, x0, y0, cell_w, cell_h, gap):
+    """Row-major grid cells, at most cols * rows."""
+    return [
+        Cell(x0 + (i % cols) * (cell_w + gap), y0 + (i // cols) * (cell_h + gap), cell_w, cell_h)
+        for i in range(min(count, cols * rows))
+    ]
+
+
+@register_layout("poster")
+def _plan_poster(count, size, gap):
+    """
+    Poster image area.
+    1: full | 2: side by side | 3: 1 large top (58%) + 2 bottom | 4+: 2x2 (first 4)
+    """
+    width, height = size
+    if count == 1:
+        return [Cell(0, 0, width, height)]
+    cell_w = (width - gap) // 2
+    if count == 2:
+        return _grid_cells(2, 2, 1, 0, 0, cell_w, height, gap)
+    if count == 3:
+        top_h = int(height * 0.58)
+        bottom_h = height - top_h - gap
+        return [Cell(0, 0, width, top_h)] + _grid_cells(2, 2, 1, 0, top_h + gap, cell_w, bottom_h, gap)
+    return _grid_cells(count, 2, 2, 0, 0, cell_w, (height - gap) // 2, gap)
+
+
+@register_layout("full_bleed")
+@register_layout("grid")
+def _plan_full_bleed(count, size, gap):
+    """Equal cells, near-seamless grid. Grows as a square-ish grid above 9 images."""
+    if count == 2:
+        cols, rows = 2, 1
+    elif count == 3:
+        cols, rows = 3, 1
+    elif count == 4:
+        cols, rows = 2, 2
+    elif count <= 6:
+        cols, rows = 3, 2
+    elif count <= 9:
+        cols, rows = 3, 3
+    else:
+        cols = math.ceil(math.sqrt(count))
+        rows = math.ceil(count / cols)
+
+    cell_w = (size[0] - gap * (cols - 1)) // cols
+    cell_h = (size[1] - gap * (rows - 1)) // rows
+    return _grid_cells(count, cols, rows, 0, 0, cell_w, cell_h, gap)
+
+
+@register_layout("feature")
+def _plan_feature(count, size, gap):
+    """
+    1 large main image + smaller ones.
+    2: left 2/3 | right 1/3
+    3: left half | right top + bottom
+    4: left half | 3 stacked on the right
+    5+: left 55% | 2-column grid on the right
+    """
+    width, height = size
+
+    if count == 2:
+        left_w = int(width * 0.65) - gap // 2
+        return [Cell(0, 0, left_w, height), Cell(left_w + gap, 0, width - left_w - gap, height)]
+
+    if count in (3, 4):
+        left_w = width // 2 - gap // 2
+        right_w = width - left_w - gap
+        stacked = count - 1
+        cell_h = (height - gap * (stacked - 1)) // stacked
+        cells = [Cell(0, 0, left_w, height)]
+        cells += [Cell(left_w + gap, i * (cell_h + gap), right_w, cell_h) for i in range(stacked)]
+        return cells
+
+    left_w = int(width * 0.55) - gap // 2
+    right_w = width - left_w - gap
+    right_x = left_w + gap
+    cells = [Cell(0, 0, left_w, height)]
+
+    remaining = count - 1
+    if remaining <= 2:
+        cell_h = (height - gap) // 2
+        cells += _grid_cells(remaining, 1, 2, right_x, 0, right_w, cell_h, gap)
+    elif remaining <= 4:
+        cells += _grid_cells(remaining, 2, 2, right_x, 0, (right_w - gap) // 2, (height - gap) // 2, gap)
+    else:
+        rows = math.ceil(remaining / 2)
+        cell_h = (height - gap * (rows - 1)) // rows
+        cells += _grid_cells(remaining, 2, rows, right_x, 0, (right_w - gap) // 2, cell_h, gap)
+    return cells
@@ -1,10 +1,10 @@
 import os
 from pathlib import Path
-import requests
-import fal_client
 from dotenv import load_dotenv
 
 from instagram import post_to_instagram
+from services import http_client
+from services import fal_gateway
 
 load_dotenv()  # .env dosyasından değişkenleri yükle
 
@@ -27,9 +27,7 @@ def pick_campaign():
     return next(c for c in CAMPAIGNS if c["id"] == cid)
 
 def download_image(url: str, save_path: Path):
-    r = requests.get(url, timeout=60)
-    r.raise_for_status()
-    save_path.write_bytes(r.content)
+    http_client.download_to(url, save_path, timeout=(http_client.CONNECT_TIMEOUT, 60))
 
 def main():
     # FAL_KEY kontrol
@@ -53,7 +51,7 @@ def main():
     print("\nAI çalışıyor, lütfen bekleyin... ☕")
 
     # ✅ TEK ÇAĞRI: Workflow
-    handler = fal_client.submit(
+    result = fal_gateway.run(
         WORKFLOW_ENDPOINT,
         arguments={
             "image_prompt": image_prompt,
@@ -61,7 +59,6 @@ def main():
             "system_prompt": system_prompt,
         },
     )
-    result = handler.get()
 
     # ✅ Response mapping (Response panelinde: images ve output)
     images = result.get("images", [])
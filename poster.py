@@ -1,7 +1,13 @@
 from PIL import Image, ImageDraw, ImageFont
-from io import BytesIO
+from functools import lru_cache
+import os
 import textwrap
 
+from image_loader import load_fitted
+from layout import PREVIEW_SCALE, plan_layout, compose_layout, scale_px, scaled_size
+from encoder import encode_image
+from render_cache import cached_render, register_assets
+
 # Font paths - macOS + Linux (GitHub Actions) destegi
 import platform
 
@@ -20,42 +26,137 @@ else:
 SIZE = (1080, 1350)
 
 
+# Ayni anda bellekte tutulacak (path, size) FreeTypeFont sayisi
+FONT_CACHE_SIZE = 32
+
+
+@lru_cache(maxsize=None)
+def _font_candidates(path):
+    """Istenen font + Turkce destekli fallback'lerden diskte olanlar (path basina bir kez)"""
+    paths = dict.fromkeys([path, FONT_UNICODE, FONT_BOLD, FONT_REGULAR])
+    return tuple(p for p in paths if os.path.exists(p))
+
+
+@lru_cache(maxsize=FONT_CACHE_SIZE)
+def _truetype(path, size):
+    """TTF dosyasini bir kez parse et, (path, size) anahtariyla LRU cache'te tut"""
+    if path is None:
+        return ImageFont.load_default()
+    return ImageFont.truetype(path, size)
+
+
 def _load_font(path, size):
     """Font yukle, bulamazsa Turkce destekli fallback dene"""
-    for font_path in [path, FONT_UNICODE, FONT_BOLD, FONT_REGULAR]:
+    for font_path in _font_candidates(path):
         try:
-            return ImageFont.truetype(font_path, size)
+            return _truetype(font_path, size)
         except (OSError, IOError):
             continue
-    return ImageFont.load_default()
+    return _truetype(None, size)
+
+
+def font_cache_info():
+    """Font cache istatistikleri: hits, misses, maxsize, currsize"""
+    return _truetype.cache_info()._asdict()
+
+
+# Platform font yollari import aninda cozulur; cozulen dosyalar render cache
+# anahtarina girer (font degisince eski afisler sunulmaz)
+for _font_path in (FONT_UNICODE, FONT_BOLD, FONT_REGULAR, FONT_BLACK):
+    register_assets(*_font_candidates(_font_path))
 
 
-def _draw_gradient(draw, width, height):
-    """Alt kismi karanliklastiran gradient overlay ciz"""
-    # Ust %25 hafif karanlik (marka alani)
-    for y in range(int(height * 0.25)):
-        alpha = 60
-        draw.rectangle([(0, y), (width, y + 1)], fill=(0, 0, 0, alpha))
+# Gradient overlay'leri (size, style) basina bir kez uretilip burada tutulur
+_GRADIENT_CACHE = {}
 
-    # Orta kisim hafif
-    for y in range(int(height * 0.25), int(height * 0.5)):
-        alpha = 40
-        draw.rectangle([(0, y), (width, y + 1)], fill=(0, 0, 0, alpha))
 
-    # Alt %50 giderek koyulasan gradient
-    for y in range(int(height * 0.5), height):
-        progress = (y - height * 0.5) / (height * 0.5)
-        alpha = int(40 + progress * 180)
-        draw.rectangle([(0, y), (width, y + 1)], fill=(0, 0, 0, alpha))
+def _poster_gradient_rows(width, height):
+    """Tek gorselli poster: alt kismi karanliklastiran satir renkleri"""
+    rows = []
+    for y in range(height):
+        if y < int(height * 0.25):
+            # Ust %25 hafif karanlik (marka alani)
+            alpha = 60
+        elif y < int(height * 0.5):
+            # Orta kisim hafif
+            alpha = 40
+        else:
+            # Alt %50 giderek koyulasan gradient
+            progress = (y - height * 0.5) / (height * 0.5)
+            alpha = int(40 + progress * 180)
+        rows.append((0, 0, 0, alpha))
+    return rows
 
 
-def _draw_discount_badge(draw, text, center_x, center_y, font):
+def _multi_gradient_rows(width, height):
+    """Coklu gorselli poster: gorsel alanindan bilgi alanina gecis satir renkleri"""
+    image_zone_h = int(height * 0.62)
+    info_zone_h = height - image_zone_h
+    # Gorsel bolgesinin alt kismindan baslayan yumusak gecis (SIZE'da 80px)
+    fade_h = scale_px(80, height / SIZE[1])
+    fade_start = image_zone_h - fade_h
+
+    rows = []
+    for y in range(height):
+        if y < fade_start:
+            rows.append((0, 0, 0, 0))
+        elif y < image_zone_h:
+            progress = (y - fade_start) / fade_h
+            rows.append((0, 0, 0, int(progress * 230)))
+        else:
+            # Bilgi alani - koyu gradient arka plan
+            progress = (y - image_zone_h) / info_zone_h
+            r = int(15 + progress * 5)
+            g = int(15 + progress * 5)
+            b = int(30 + progress * 10)
+            rows.append((r, g, b, 245))
+    return rows
+
+
+_GRADIENT_STYLES = {
+    "poster": _poster_gradient_rows,
+    "multi": _multi_gradient_rows,
+}
+
+
+def _gradient_overlay(size, style):
+    """
+    Gradient overlay'i cache'ten dondur, yoksa olustur.
+
+    Gradient sadece dikeyde degistigi icin 1px genisliginde bir sutun
+    hesaplanir ve NEAREST ile tum genislige yayilir; satir satir cizim yok.
+    Donen gorsel paylasimlidir, uzerine cizim yapilmamali.
+    """
+    key = (size, style)
+    overlay = _GRADIENT_CACHE.get(key)
+    if overlay is None:
+        width, height = size
+        column = Image.new("RGBA", (1, height))
+        column.putdata(_GRADIENT_STYLES[style](width, height))
+        overlay = column.resize(size, Image.NEAREST)
+        _GRADIENT_CACHE[key] = overlay
+    return overlay
+
+
+def warm_caches():
+    """
+    Poster fontlarini ve gradient overlay'lerini onceden yukle.
+    Batch worker'lari ilk poster'da bekleme yasamasin diye kullanilir.
+    """
+    for scale in (1, PREVIEW_SCALE):
+        for size in (42, 46, 48, 52, 54, 58):
+            _load_font(FONT_UNICODE, scale_px(size, scale))
+        for style in _GRADIENT_STYLES:
+            _gradient_overlay(scaled_size(SIZE, scale), style)
+
+
+def _draw_discount_badge(draw, text, center_x, center_y, font, scale=1):
     """Indirim badge'i ciz"""
     bbox = font.getbbox(text)
     text_w = bbox[2] - bbox[0]
     text_h = bbox[3] - bbox[1]
 
-    pad_x, pad_y = 40, 20
+    pad_x, pad_y = scale_px(40, scale), scale_px(20, scale)
     badge_w = text_w + pad_x * 2
     badge_h = text_h + pad_y * 2
 
@@ -79,45 +180,48 @@ def _draw_text_with_shadow(draw, xy, text, font, fill="white", shadow_offset=3):
     draw.text((x, y), text, fill=fill, font=font, anchor="mt")
 
 
-def create_poster(image_bytes, title, discount, title_y_percent=58):
+def prepare_poster_background(image_bytes, size=SIZE, cache=False):
     """
-    AI gorselinin uzerine kampanya bilgileri ekleyerek afis olustur.
+    create_poster arka planini hazirla: gorseli ac, boyutlandir, gradient uygula.
+    Metinden bagimsiz oldugu icin ayni gorsel ile tekrar tekrar kullanilabilir.
 
     Args:
-        image_bytes: Arka plan gorseli (bytes)
-        title: Kampanya basligi
-        discount: Indirim bilgisi
-        title_y_percent: Baslik dikey konumu (0-90, yuzde olarak). Default 58.
+        size: Cikti boyutu (preview icin SIZE'in kucultulmus hali)
+        cache: Decode edilmis kaynagi preview'lar icin cache'le
 
     Returns:
-        bytes: JPEG poster gorseli
+        Image: RGB arka plan
     """
-    width, height = SIZE
-
-    # Arka plan gorselini ac ve boyutlandir
-    bg = Image.open(BytesIO(image_bytes)).convert("RGBA")
-    bg = bg.resize(SIZE, Image.LANCZOS)
+    bg = load_fitted(image_bytes, size, crop=False, cache=cache).convert("RGBA")
 
     # Gradient overlay
-    overlay = Image.new("RGBA", SIZE, (0, 0, 0, 0))
-    draw_overlay = ImageDraw.Draw(overlay)
-    _draw_gradient(draw_overlay, width, height)
-    bg = Image.alpha_composite(bg, overlay)
+    bg = Image.alpha_composite(bg, _gradient_overlay(size, "poster"))
+    return bg.convert("RGB")
 
-    # RGB'ye cevir ve cizim baslat
-    poster = bg.convert("RGB")
+
+def render_poster_text(background, title, discount, title_y_percent=58):
+    """
+    Hazir arka planin bir kopyasina baslik ve indirim badge'i ciz.
+    Olculer arka planin SIZE'a oranina gore olceklenir (preview).
+
+    Returns:
+        Image: RGB poster
+    """
+    width, height = background.size
+    scale = width / SIZE[0]
+    poster = background.copy()
     draw = ImageDraw.Draw(poster)
 
     # Fontlar - Türkçe karakter desteği için FONT_UNICODE öncelikli
-    font_title = _load_font(FONT_UNICODE, 58)
-    font_discount = _load_font(FONT_UNICODE, 52)
+    font_title = _load_font(FONT_UNICODE, scale_px(58, scale))
+    font_discount = _load_font(FONT_UNICODE, scale_px(52, scale))
 
     # === KAMPANYA BASLIGI (alt bolge) ===
     if len(title) > 40:
-        font_title = _load_font(FONT_UNICODE, 46)
+        font_title = _load_font(FONT_UNICODE, scale_px(46, scale))
         wrap_width = 24
     elif len(title) > 25:
-        font_title = _load_font(FONT_UNICODE, 52)
+        font_title = _load_font(FONT_UNICODE, scale_px(52, scale))
         wrap_width = 20
     else:
         wrap_width = 18
@@ -127,202 +231,109 @@ def create_poster(image_bytes, title, discount, title_y_percent=58):
     # Baslik konumu - ayarlanabilir
     title_y_percent = max(10, min(90, title_y_percent))
     title_start_y = height * (title_y_percent / 100.0)
-    line_spacing = 70 if len(title) <= 40 else 58
+    line_spacing = scale_px(70 if len(title) <= 40 else 58, scale)
+    shadow_offset = scale_px(3, scale)
 
     for line in wrapped_lines:
-        _draw_text_with_shadow(draw, (width // 2, title_start_y), line, font_title)
+        _draw_text_with_shadow(draw, (width // 2, title_start_y), line, font_title, shadow_offset=shadow_offset)
         title_start_y += line_spacing
 
     # === INDIRIM BADGE (basligin altinda) ===
-    badge_y = title_start_y + 40
-    _draw_discount_badge(draw, discount, width // 2, int(badge_y), font_discount)
+    badge_y = title_start_y + scale_px(40, scale)
+    _draw_discount_badge(draw, discount, width // 2, int(badge_y), font_discount, scale)
 
-    # Kaydet
-    output = BytesIO()
-    poster.save(output, format="JPEG", quality=95)
-    return output.getvalue()
+    return poster
 
 
-def _crop_to_fill(img, target_width, target_height):
-    """Gorseli hedef boyuta gore ortadan kirp (bosluk kalmaz)"""
-    img_ratio = img.width / img.height
-    target_ratio = target_width / target_height
+def encode_poster(image, encoding="publish"):
+    """
+    Poster/collage gorselini encoder preset'i ile encode et (bkz. encoder.ENCODE_PRESETS).
+    EncodeResult doner: bytes (.data) ve secilen ayarlar (.settings).
+    """
+    return encode_image(image, encoding)
+
+
+def _render_params(preview, encoding):
+    """preview bayragina gore cikti boyutu ve varsayilan encoder preset'i"""
+    size = scaled_size(SIZE, PREVIEW_SCALE) if preview else SIZE
+    return size, encoding or ("preview" if preview else "publish")
 
-    if img_ratio > target_ratio:
-        new_height = target_height
-        new_width = int(img.width * (target_height / img.height))
-    else:
-        new_width = target_width
-        new_height = int(img.height * (target_width / img.width))
 
-    img = img.resize((new_width, new_height), Image.LANCZOS)
+@cached_render("poster")
+def create_poster(image_bytes, title, discount, title_y_percent=58, encoding=None, preview=False):
+    """
+    AI gorselinin uzerine kampanya bilgileri ekleyerek afis olustur.
+
+    Args:
+        image_bytes: Arka plan gorseli (bytes)
+        title: Kampanya basligi
+        discount: Indirim bilgisi
+        title_y_percent: Baslik dikey konumu (0-90, yuzde olarak). Default 58.
+        encoding: Cikti encoder preset'i ("publish", "high", "preview").
+                  None ise preview'da "preview", degilse "publish".
+        preview: Ayni layout ile PREVIEW_SCALE cozunurlukte hizli render
 
-    left = (new_width - target_width) // 2
-    top = (new_height - target_height) // 2
-    return img.crop((left, top, left + target_width, top + target_height))
+    Returns:
+        bytes: Poster gorseli (publish: JPEG).
+        .encoded(...) ile ayni render EncodeResult (bytes + encoder ayarlari) olarak doner.
+    """
+    size, encoding = _render_params(preview, encoding)
+    background = prepare_poster_background(image_bytes, size, cache=preview)
+    poster = render_poster_text(background, title, discount, title_y_percent)
+    return encode_poster(poster, encoding)
 
 
-def create_raw_collage(image_bytes_list):
+@cached_render("raw_collage")
+def create_raw_collage(image_bytes_list, encoding=None, preview=False):
     """
     Birden fazla gorseli tek bir 1080x1350 collage'a birlestir.
     Text overlay YOK - AI stilizasyonu oncesi ham gorsel.
 
     Args:
         image_bytes_list: Gorsel bytes listesi (1-4 adet)
+        encoding: Cikti encoder preset'i (bkz. create_poster)
+        preview: Ayni layout ile PREVIEW_SCALE cozunurlukte hizli render
 
     Returns:
-        bytes: JPEG collage gorseli
+        bytes: Collage gorseli (publish: JPEG).
+        .encoded(...) ile ayni render EncodeResult (bytes + encoder ayarlari) olarak doner.
     """
-    width, height = SIZE
-    gap = 4
-
-    images = []
-    for img_bytes in image_bytes_list:
-        img = Image.open(BytesIO(img_bytes)).convert("RGB")
-        images.append(img)
-
-    n = len(images)
-    canvas = Image.new("RGB", SIZE, (0, 0, 0))
-
-    if n == 1:
-        cropped = _crop_to_fill(images[0], width, height)
-        canvas.paste(cropped, (0, 0))
-
-    elif n == 2:
-        cell_w = (width - gap) // 2
-        for i, img in enumerate(images[:2]):
-            cropped = _crop_to_fill(img, cell_w, height)
-            x = i * (cell_w + gap)
-            canvas.paste(cropped, (x, 0))
-
-    elif n == 3:
-        # 1 buyuk ust (%58) + 2 kucuk alt
-        top_h = int(height * 0.58)
-        bottom_h = height - top_h - gap
-
-        cropped_top = _crop_to_fill(images[0], width, top_h)
-        canvas.paste(cropped_top, (0, 0))
-
-        cell_w = (width - gap) // 2
-        for i, img in enumerate(images[1:3]):
-            cropped = _crop_to_fill(img, cell_w, bottom_h)
-            x = i * (cell_w + gap)
-            canvas.paste(cropped, (x, top_h + gap))
+    size, encoding = _render_params(preview, encoding)
+    gap = scale_px(4, size[0] / SIZE[0])
 
-    else:
-        # 4 gorsel: 2x2 grid
-        cols, rows = 2, 2
-        cell_w = (width - gap) // cols
-        cell_h = (height - gap) // rows
+    canvas = Image.new("RGB", size, (0, 0, 0))
+    cells = plan_layout("poster", len(image_bytes_list), size, gap)
+    compose_layout(canvas, image_bytes_list, cells, cache=preview)
 
-        for idx, img in enumerate(images[:4]):
-            row = idx // cols
-            col = idx % cols
-            cropped = _crop_to_fill(img, cell_w, cell_h)
-            x = col * (cell_w + gap)
-            y = row * (cell_h + gap)
-            canvas.paste(cropped, (x, y))
+    return encode_poster(canvas, encoding)
 
-    output = BytesIO()
-    canvas.save(output, format="JPEG", quality=95)
-    return output.getvalue()
 
-
-def create_poster_from_multiple(image_bytes_list, title, discount, title_y_percent=None):
+def prepare_multi_poster_background(image_bytes_list, size=SIZE, cache=False):
     """
-    Birden fazla gorseli tek bir poster icinde birlestir.
+    create_poster_from_multiple arka planini hazirla: gorsel alani, gradient
+    gecisi ve accent cizgi. Metinden bagimsizdir, tekrar kullanilabilir.
 
     Args:
-        image_bytes_list: Gorsel bytes listesi
-        title: Kampanya basligi
-        discount: Indirim bilgisi
-        title_y_percent: Yazi dikey konumu (0-90). None ise otomatik ortala.
+        size: Cikti boyutu (preview icin SIZE'in kucultulmus hali)
+        cache: Decode edilmis kaynaklari preview'lar icin cache'le
 
     Returns:
-        bytes: JPEG poster gorseli
+        Image: RGB arka plan
     """
-    width, height = SIZE
-    gap = 4
-
-    # Gorselleri ac
-    images = []
-    for img_bytes in image_bytes_list:
-        img = Image.open(BytesIO(img_bytes)).convert("RGB")
-        images.append(img)
-
-    n = len(images)
+    width, height = size
+    scale = width / SIZE[0]
+    gap = scale_px(4, scale)
 
     # Gorsel alani: ust %62, kampanya bilgisi alt %38
     image_zone_h = int(height * 0.62)
-    info_zone_h = height - image_zone_h
-
-    # Canvas
-    canvas = Image.new("RGBA", SIZE, (0, 0, 0, 255))
-
-    if n == 1:
-        # Tek gorsel - tam kapla
-        cropped = _crop_to_fill(images[0], width, image_zone_h)
-        canvas.paste(cropped, (0, 0))
-
-    elif n == 2:
-        # Yan yana 2 gorsel
-        cell_w = (width - gap) // 2
-        for i, img in enumerate(images[:2]):
-            cropped = _crop_to_fill(img, cell_w, image_zone_h)
-            x = i * (cell_w + gap)
-            canvas.paste(cropped, (x, 0))
-
-    elif n == 3:
-        # Ust: 1 buyuk gorsel (tam genislik, %55 yukseklik)
-        # Orta: 2 kucuk gorsel yan yana
-        top_h = int(image_zone_h * 0.58)
-        bottom_h = image_zone_h - top_h - gap
-
-        # Ust buyuk gorsel
-        cropped_top = _crop_to_fill(images[0], width, top_h)
-        canvas.paste(cropped_top, (0, 0))
-
-        # Alt 2 gorsel
-        cell_w = (width - gap) // 2
-        for i, img in enumerate(images[1:3]):
-            cropped = _crop_to_fill(img, cell_w, bottom_h)
-            x = i * (cell_w + gap)
-            canvas.paste(cropped, (x, top_h + gap))
 
-    else:
-        # 4+ gorsel: 2x2 grid
-        cols, rows = 2, 2
-        cell_w = (width - gap) // cols
-        cell_h = (image_zone_h - gap) // rows
-
-        for idx, img in enumerate(images[:4]):
-            row = idx // cols
-            col = idx % cols
-            cropped = _crop_to_fill(img, cell_w, cell_h)
-            x = col * (cell_w + gap)
-            y = row * (cell_h + gap)
-            canvas.paste(cropped, (x, y))
+    # Canvas + gorsel alani (her gorsel kendi hucre boyutunda decode edilir)
+    canvas = Image.new("RGBA", size, (0, 0, 0, 255))
+    cells = plan_layout("poster", len(image_bytes_list), (width, image_zone_h), gap)
+    compose_layout(canvas, image_bytes_list, cells, cache=cache)
 
     # Alt bilgi alanina koyu arka plan + hafif gradient gecisi
-    overlay = Image.new("RGBA", SIZE, (0, 0, 0, 0))
-    draw_ov = ImageDraw.Draw(overlay)
-
-    # Gorsel bolgesinin alt kismindan baslayan yumusak gecis
-    fade_start = image_zone_h - 80
-    for y in range(fade_start, image_zone_h):
-        progress = (y - fade_start) / 80
-        alpha = int(progress * 230)
-        draw_ov.rectangle([(0, y), (width, y + 1)], fill=(0, 0, 0, alpha))
-
-    # Bilgi alani - koyu gradient arka plan
-    for y in range(image_zone_h, height):
-        progress = (y - image_zone_h) / info_zone_h
-        r = int(15 + progress * 5)
-        g = int(15 + progress * 5)
-        b = int(30 + progress * 10)
-        draw_ov.rectangle([(0, y), (width, y + 1)], fill=(r, g, b, 245))
-
-    canvas = Image.alpha_composite(canvas, overlay)
+    canvas = Image.alpha_composite(canvas, _gradient_overlay(size, "multi"))
 
     # RGB'ye cevir ve cizim
     poster = canvas.convert("RGB")
@@ -331,20 +342,39 @@ def create_poster_from_multiple(image_bytes_list, title, discount, title_y_perce
     # Accent cizgi (gorsel ile bilgi arasi ince renkli serit)
     accent_color = "#e11d48"
     draw.rectangle(
-        [(width // 4, image_zone_h + 2), (3 * width // 4, image_zone_h + 5)],
+        [(width // 4, image_zone_h + scale_px(2, scale)), (3 * width // 4, image_zone_h + scale_px(5, scale))],
         fill=accent_color,
     )
 
+    return poster
+
+
+def render_multi_poster_text(background, title, discount, title_y_percent=None):
+    """
+    prepare_multi_poster_background ciktisinin bir kopyasina baslik ve
+    indirim badge'i ciz.
+
+    Returns:
+        Image: RGB poster
+    """
+    width, height = background.size
+    scale = width / SIZE[0]
+    image_zone_h = int(height * 0.62)
+    info_zone_h = height - image_zone_h
+
+    poster = background.copy()
+    draw = ImageDraw.Draw(poster)
+
     # Fontlar
-    font_title = _load_font(FONT_UNICODE, 54)
-    font_discount = _load_font(FONT_UNICODE, 46)
+    font_title = _load_font(FONT_UNICODE, scale_px(54, scale))
+    font_discount = _load_font(FONT_UNICODE, scale_px(46, scale))
 
     # === KAMPANYA BASLIGI ===
     if len(title) > 40:
-        font_title = _load_font(FONT_UNICODE, 42)
+        font_title = _load_font(FONT_UNICODE, scale_px(42, scale))
         wrap_width = 26
     elif len(title) > 25:
-        font_title = _load_font(FONT_UNICODE, 48)
+        font_title = _load_font(FONT_UNICODE, scale_px(48, scale))
         wrap_width = 22
     else:
         wrap_width = 18
@@ -352,27 +382,48 @@ def create_poster_from_multiple(image_bytes_list, title, discount, title_y_perce
     wrapped_lines = textwrap.wrap(title, width=wrap_width)
 
     # Tum icerik yuksekligini hesapla ve dikey ortala
-    line_spacing = 64 if len(title) <= 40 else 52
+    line_spacing = scale_px(64 if len(title) <= 40 else 52, scale)
     title_block_h = len(wrapped_lines) * line_spacing
-    badge_h = 70
-    spacing_title_badge = 45
+    badge_h = scale_px(70, scale)
+    spacing_title_badge = scale_px(45, scale)
     total_content_h = title_block_h + spacing_title_badge + badge_h
 
     if title_y_percent is not None:
         content_start_y = int(height * (max(10, min(90, title_y_percent)) / 100.0))
     else:
-        content_start_y = image_zone_h + (info_zone_h - total_content_h) // 2 + 10
+        content_start_y = image_zone_h + (info_zone_h - total_content_h) // 2 + scale_px(10, scale)
 
+    shadow_offset = scale_px(3, scale)
     title_y = content_start_y
     for line in wrapped_lines:
-        _draw_text_with_shadow(draw, (width // 2, title_y), line, font_title)
+        _draw_text_with_shadow(draw, (width // 2, title_y), line, font_title, shadow_offset=shadow_offset)
         title_y += line_spacing
 
     # === INDIRIM BADGE ===
     badge_y = title_y + spacing_title_badge
-    _draw_discount_badge(draw, discount, width // 2, int(badge_y), font_discount)
+    _draw_discount_badge(draw, discount, width // 2, int(badge_y), font_discount, scale)
+
+    return poster
+
+
+@cached_render("multi_poster")
+def create_poster_from_multiple(image_bytes_list, title, discount, title_y_percent=None, encoding=None, preview=False):
+    """
+    Birden fazla gorseli tek bir poster icinde birlestir.
+
+    Args:
+        image_bytes_list: Gorsel bytes listesi
+        title: Kampanya basligi
+        discount: Indirim bilgisi
+        title_y_percent: Yazi dikey konumu (0-90). None ise otomatik ortala.
+        encoding: Cikti encoder preset'i (bkz. create_poster)
+        preview: Ayni layout ile PREVIEW_SCALE cozunurlukte hizli render
 
-    # Kaydet
-    output = BytesIO()
-    poster.save(output, format="JPEG", quality=95)
-    return output.getvalue()
+    Returns:
+        bytes: Poster gorseli (publish: JPEG).
+        .encoded(...) ile ayni render EncodeResult (bytes + encoder ayarlari) olarak doner.
+    """
+    size, encoding = _render_params(preview, encoding)
+    background = prepare_multi_poster_background(image_bytes_list, size, cache=preview)
+    poster = render_multi_poster_text(background, title, discount, title_y_percent)
+    return encode_poster(poster, encoding)
@@ -0,0 +1,146 @@
+"""
+Content-addressed cache for encoded renders.
+
+create_poster, create_poster_from_multiple, create_raw_collage and
+create_collage are pure functions of their inputs, so their output is
+cached on disk under sha256(renderer, RENDERER_VERSION, image bytes,
+title, discount, layout, every other parameter). A repeated render (same
+campaign on another scheduler run, the UI re-posting the same files) is
+a file read.
+
+The render functions return an encoder.EncodeResult. Calling one returns
+the encoded bytes; fn.encoded(...) returns the EncodeResult, so callers
+that report the chosen encoder settings get them on a cache hit too (they
+are stored in the entry, ahead of the image bytes).
+
+Bump RENDERER_VERSION whenever rendering output changes (layouts,
+gradients, encoder presets) so stale renders are not served. Files the
+renders read besides their arguments (fonts) are registered with
+register_assets; their resolved paths, sizes and mtimes are part of the
+key, so a font installed, removed or updated on the host is picked up
+without a version bump.
+
+Environment:
+    RENDER_CACHE_DIR        Cache directory (default .cache/renders, empty disables)
+    RENDER_CACHE_MAX_BYTES  Size bound for LRU eviction (default 512MB)
+"""
+import os
+import json
+import hashlib
+import inspect
+from functools import wraps
+from typing import Any, Dict, List, Optional
+
+from disk_cache import DiskCache
+from encoder import EncodeResult
+
+RENDERER_VERSION = "3"
+
+RENDER_CACHE_DIR = os.getenv("RENDER_CACHE_DIR", ".cache/renders")
+RENDER_CACHE_MAX_BYTES = int(os.getenv("RENDER_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+
+_cache: Optional[DiskCache] = DiskCache(RENDER_CACHE_DIR, RENDER_CACHE_MAX_BYTES) if RENDER_CACHE_DIR else None
+
+_asset_paths: List[str] = []
+_assets_fingerprint: Optional[str] = None
+
+
+def register_assets(*paths: str):
+    """Add files (fonts, branding images) the renders depend on to the cache key."""
+    global _assets_fingerprint
+    for path in paths:
+        if path not in _asset_paths:
+            _asset_paths.append(path)
+    _assets_fingerprint = None
+
+
+def assets_fingerprint() -> str:
+    """Hash of the registered asset paths with their size and mtime (once per process)."""
+    global _assets_fingerprint
+    if _assets_fingerprint is None:
+        parts = []
+        for path in sorted(_asset_paths):
+            try:
+                stat = os.stat(path)
+                parts.append(f"{path}:{stat.st_size}:{stat.st_mtime_ns}")
+            except OSError:
+                parts.append(f"{path}:missing")
+        _assets_fingerprint = hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()
+    return _assets_fingerprint
+
+
+def _fingerprint(value: Any) -> Any:
+    """JSON-able stand-in for an argument; image bytes are replaced by their hash."""
+    if isinstance(value, (bytes, bytearray)):
+        return hashlib.sha256(value).hexdigest()
+    if isinstance(value, (list, tuple)):
+        return [_fingerprint(v) for v in value]
+    return value
+
+
+def render_key(name: str, params: Dict[str, Any]) -> str:
+    payload = json.dumps(
+        {"renderer": name, "version": RENDERER_VERSION, "assets": assets_fingerprint(),
+         "params": {k: _fingerprint(v) for k, v in params.items()}},
+        sort_keys=True, default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _pack(result: EncodeResult) -> bytes:
+    """Cache entry: the settings as one JSON line, then the image bytes."""
+    return json.dumps(result.settings, sort_keys=True).encode("utf-8") + b"\n" + result.data
+
+
+def _unpack(entry: bytes) -> Optional[EncodeResult]:
+    header, sep, data = entry.partition(b"\n")
+    if not sep:
+        return None
+    try:
+        return EncodeResult(data, json.loads(header))
+    except ValueError:
+        return None
+
+
+def cached_render(name: str):
+    """
+    Cache a render function's EncodeResult on disk.
+
+    Arguments are bound with their defaults, so create_poster(img, t, d)
+    and create_poster(img, t, d, 58) share an entry. Preview renders are
+    not cached (they are cheap and mostly one-off slider positions).
+    """
+    def decorator(fn):
+        signature = inspect.signature(fn)
+
+        def encoded(*args, **kwargs) -> EncodeResult:
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            if _cache is None or bound.arguments.get("preview"):
+                return fn(*args, **kwargs)
+
+            key = render_key(name, bound.arguments)
+            entry = _cache.get(key)
+            result = _unpack(entry) if entry is not None else None
+            if result is None:
+                result = fn(*args, **kwargs)
+                try:
+                    _cache.set(key, _pack(result))
+                except OSError as e:
+                    print(f"Render cache write failed: {e}")
+            return result
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs) -> bytes:
+            return encoded(*args, **kwargs).data
+
+        wrapper.encoded = wraps(fn)(encoded)
+        return wrapper
+    return decorator
+
+
+def render_cache_info() -> Dict[str, Any]:
+    """Render cache statistics: hits, misses, writes, evictions, entries, bytes."""
+    if _cache is None:
+        return {"enabled": False}
+    return {"enabled": True, "directory": RENDER_CACHE_DIR, **_cache.stats()}
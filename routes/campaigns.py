@@ -3,10 +3,18 @@ import requests
 from flask import Blueprint, request, jsonify
 
 from services.campaigns import load_campaigns, save_campaigns, DEFAULT_NEGATIVE_PROMPT
-from services.scraper import scrape_campaign_page, extract_campaign_info
+from services.scraper import PageSnapshot, extract_campaign
+from services.bulk_import import import_campaigns
+from routes.jobs import respond_with_job, wants_async
 
 campaigns_bp = Blueprint('campaigns', __name__)
 
+# URLs per /add-campaigns-bulk request. Inline imports hold the request
+# thread, so they stay small; a background job only needs a sanity bound,
+# concurrency is already limited per host and by LLM_WORKERS.
+MAX_INLINE_BULK_URLS = 5
+MAX_BULK_URLS = 1000
+
 
 @campaigns_bp.route('/add-campaign', methods=['POST'])
 def add_campaign():
@@ -16,8 +24,7 @@ def add_campaign():
         if not url:
             return jsonify({"error": "URL is required"}), 400
 
-        page_content = scrape_campaign_page(url)
-        info = extract_campaign_info(page_content)
+        info, extraction = extract_campaign(PageSnapshot.fetch(url))
 
         campaigns = load_campaigns()
         new_id = max((c["id"] for c in campaigns), default=0) + 1
@@ -32,7 +39,7 @@ def add_campaign():
         campaigns.append(campaign)
         save_campaigns(campaigns)
 
-        return jsonify({"success": True, "campaign": campaign})
+        return jsonify({"success": True, "campaign": campaign, "extraction": extraction})
 
     except requests.exceptions.RequestException as e:
         return jsonify({"error": f"Failed to load page: {str(e)}"}), 400
@@ -42,6 +49,45 @@ def add_campaign():
         return jsonify({"error": str(e)}), 500
 
 
+@campaigns_bp.route('/add-campaigns-bulk', methods=['POST'])
+def add_campaigns_bulk():
+    """
+    Scrape and add many campaign URLs concurrently, saved in one write.
+    With ?async=1 the import runs as a background job reporting per-URL progress.
+    """
+    try:
+        urls = request.json.get('urls', [])
+        if not isinstance(urls, list):
+            return jsonify({"error": "urls must be a non-empty list"}), 400
+        urls = [u for u in urls if isinstance(u, str) and u.strip()]
+        if not urls:
+            return jsonify({"error": "urls must be a non-empty list"}), 400
+
+        if wants_async():
+            if len(urls) > MAX_BULK_URLS:
+                return jsonify({"error": f"At most {MAX_BULK_URLS} URLs per request"}), 400
+        elif len(urls) > MAX_INLINE_BULK_URLS:
+            return jsonify({
+                "error": f"At most {MAX_INLINE_BULK_URLS} URLs without ?async=1; "
+                         "use ?async=1 to import more as a background job"
+            }), 400
+
+        return respond_with_job("bulk-import", _bulk_import_work, urls)
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+def _bulk_import_work(report, urls):
+    report("scrape")
+
+    def progress(done, total, result):
+        report("scrape", f"{done}/{total} URLs")
+
+    summary = import_campaigns(urls, on_progress=progress)
+    return {"success": True, **summary}
+
+
 @campaigns_bp.route('/scrape-campaign', methods=['POST'])
 def scrape_campaign():
     """Scrape campaign URL, fill in info, and save."""
@@ -57,8 +103,8 @@ def scrape_campaign():
         if not url:
             return jsonify({"error": "Campaign has no URL"}), 400
 
-        page_content = scrape_campaign_page(url)
-        info = extract_campaign_info(page_content)
+        # Structured data first; the stored category is reused instead of asking the LLM again
+        info, extraction = extract_campaign(PageSnapshot.fetch(url), known={"category": campaign.get("category")})
 
         campaign["title"] = info["title"]
         campaign["category"] = info["category"]
@@ -67,7 +113,7 @@ def scrape_campaign():
             campaign["negative_prompt"] = DEFAULT_NEGATIVE_PROMPT
         save_campaigns(campaigns)
 
-        return jsonify({"success": True, "campaign": campaign})
+        return jsonify({"success": True, "campaign": campaign, "extraction": extraction})
 
     except requests.exceptions.RequestException as e:
         return jsonify({"error": f"Failed to load page: {str(e)}"}), 400
@@ -4,7 +4,8 @@ from pathlib import Path
 from flask import Blueprint, request, jsonify
 
 from services.campaigns import load_campaigns
-from services.content import generate_instagram_content, generate_caption, generate_website_content
+from services.content import generate_instagram_content, generate_caption, iter_website_content
+from routes.jobs import respond_with_job
 from poster import create_poster
 
 generation_bp = Blueprint('generation', __name__)
@@ -24,28 +25,34 @@ def generate():
         if not campaign:
             return jsonify({"error": "Campaign not found"}), 404
 
-        result = generate_instagram_content(campaign)
-        image_base64 = result["image_base64"]
-
-        if poster_mode:
-            poster_bytes = create_poster(
-                result["image_data"],
-                campaign["title"],
-                campaign["discount"],
-            )
-            image_base64 = base64.b64encode(poster_bytes).decode("utf-8")
-
-        return jsonify({
-            "success": True,
-            "image_base64": image_base64,
-            "post_text": result["post_text"],
-            "image_url": result["image_url"]
-        })
+        return respond_with_job("generate", _generate_work, campaign, poster_mode)
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
+def _generate_work(report, campaign, poster_mode):
+    report("generate")
+    result = generate_instagram_content(campaign)
+    image_base64 = result["image_base64"]
+
+    if poster_mode:
+        report("render")
+        poster_bytes = create_poster(
+            result["image_data"],
+            campaign["title"],
+            campaign["discount"],
+        )
+        image_base64 = base64.b64encode(poster_bytes).decode("utf-8")
+
+    return {
+        "success": True,
+        "image_base64": image_base64,
+        "post_text": result["post_text"],
+        "image_url": result["image_url"]
+    }
+
+
 @generation_bp.route('/generate-caption', methods=['POST'])
 def generate_caption_endpoint():
     """Generate campaign caption with AI."""
@@ -91,18 +98,25 @@ def generate_website_content_endpoint():
         if not reference_images:
             reference_images = None
 
-        results = generate_website_content(campaign, reference_images, num_images)
-        images = [{
-            "image_base64": r["image_base64"],
-            "image_url": r["image_url"]
-        } for r in results]
-
-        return jsonify({"success": True, "images": images})
+        return respond_with_job("website-content", _website_content_work, campaign, reference_images, num_images)
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
+def _website_content_work(report, campaign, reference_images, num_images):
+    results = []
+    for result in iter_website_content(campaign, reference_images, num_images, report=report):
+        results.append(result)
+        report("generate", f"{len(results)}/{num_images} images")
+
+    images = [{
+        "image_base64": r["image_base64"],
+        "image_url": r["image_url"]
+    } for r in sorted(results, key=lambda r: r["index"])]
+    return {"success": True, "images": images}
+
+
 @generation_bp.route('/download/<int:campaign_id>')
 def download(campaign_id):
     """Download generated content."""
@@ -111,20 +125,25 @@ def download(campaign_id):
         if not campaign:
             return "Campaign not found", 404
 
-        out_dir = Path.home() / "Desktop" / campaign["title"].replace(" ", "_")
-        out_dir.mkdir(parents=True, exist_ok=True)
+        return respond_with_job("download", _download_work, campaign)
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
 
-        result = generate_instagram_content(campaign)
+def _download_work(report, campaign):
+    out_dir = Path.home() / "Desktop" / campaign["title"].replace(" ", "_")
+    out_dir.mkdir(parents=True, exist_ok=True)
 
-        image_path = out_dir / "image.jpg"
-        image_path.write_bytes(result["image_data"])
-        (out_dir / "caption.txt").write_text(result["post_text"], encoding="utf-8")
+    report("generate")
+    result = generate_instagram_content(campaign)
 
-        return jsonify({
-            "success": True,
-            "folder_path": str(out_dir),
-            "message": f"Content saved to Desktop/{campaign['title'].replace(' ', '_')}"
-        })
+    image_path = out_dir / "image.jpg"
+    image_path.write_bytes(result["image_data"])
+    (out_dir / "caption.txt").write_text(result["post_text"], encoding="utf-8")
 
-    except Exception as e:
-        return jsonify({"error": str(e)}), 500
+    return {
+        "success": True,
+        "folder_path": str(out_dir),
+        "message": f"Content saved to Desktop/{campaign['title'].replace(' ', '_')}"
+    }
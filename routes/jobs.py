@@ -0,0 +1,67 @@
+import json
+from flask import Blueprint, Response, request, jsonify, stream_with_context
+
+from services.jobs import submit_job, get_job, run_inline
+
+jobs_bp = Blueprint('jobs', __name__)
+
+# Seconds between keep-alive comments on an idle progress stream
+KEEPALIVE_INTERVAL = 15
+
+
+def wants_async():
+    """True when the request opted in to a background job (?async=1)."""
+    return request.args.get('async', '').lower() in ('1', 'true', 'yes')
+
+
+def respond_with_job(kind, work, *args):
+    """
+    Run work(report, *args) as a background job when the request asked
+    for it (202 with the job id), otherwise inline (200 with the result).
+    """
+    if wants_async():
+        job = submit_job(kind, work, *args)
+        return jsonify(job.summary()), 202
+    return jsonify(run_inline(work, *args))
+
+
+@jobs_bp.route('/jobs/<job_id>')
+def job_status(job_id):
+    """Job status, progress events and (when succeeded) the result."""
+    job = get_job(job_id)
+    if not job:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(job.to_dict())
+
+
+@jobs_bp.route('/jobs/<job_id>/events')
+def job_events(job_id):
+    """
+    Server-Sent Events progress stream.
+
+    Sends a "progress" event per status/stage change and a final "done"
+    event with the job summary; the result is fetched from /jobs/<id>.
+    """
+    job = get_job(job_id)
+    if not job:
+        return jsonify({"error": "Job not found"}), 404
+
+    def stream():
+        seen = 0
+        while True:
+            events = job.wait_for_events(seen, KEEPALIVE_INTERVAL)
+            if not events and not job.finished:
+                yield ": keepalive\n\n"
+                continue
+            for event in events:
+                yield f"event: progress\ndata: {json.dumps(event)}\n\n"
+            seen += len(events)
+            if job.finished and seen >= len(job.events):
+                yield f"event: done\ndata: {json.dumps(job.summary())}\n\n"
+                return
+
+    return Response(
+        stream_with_context(stream()),
+        mimetype='text/event-stream',
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,13 +1,14 @@
-import os
-import tempfile
 import base64
-import requests
-import fal_client
 from flask import Blueprint, request, jsonify
 
 from services.campaigns import load_campaigns
 from collage import create_collage
-from poster import create_poster, create_poster_from_multiple, create_raw_collage
+from poster import create_poster_from_multiple, create_raw_collage
+from encoder import preset_mime_type
+from services.render_sessions import create_session, get_session, render_session
+from services.image_fetcher import fetch_images, ImageFetchError
+from services.uploads import upload_bytes, upload_stream, upload_many
+from routes.jobs import respond_with_job
 
 media_bp = Blueprint('media', __name__)
 
@@ -23,13 +24,7 @@ def upload_image():
         if file.filename == '':
             return jsonify({"error": "No file selected"}), 400
 
-        ext = os.path.splitext(file.filename)[1] or '.jpg'
-        with tempfile.NamedTemporaryFile(delete=False, suffix=ext) as tmp:
-            file.save(tmp.name)
-            tmp_path = tmp.name
-
-        url = fal_client.upload_file(tmp_path)
-        os.unlink(tmp_path)
+        url = upload_stream(file)
 
         return jsonify({"success": True, "url": url})
 
@@ -50,19 +45,7 @@ def upload_images():
         if len(files) > 10:
             return jsonify({"error": "Maximum 10 images can be uploaded"}), 400
 
-        uploaded_urls = []
-        for file in files:
-            if file.filename == '':
-                continue
-
-            ext = os.path.splitext(file.filename)[1] or '.jpg'
-            with tempfile.NamedTemporaryFile(delete=False, suffix=ext) as tmp:
-                file.save(tmp.name)
-                tmp_path = tmp.name
-
-            url = fal_client.upload_file(tmp_path)
-            uploaded_urls.append(url)
-            os.unlink(tmp_path)
+        uploaded_urls = upload_many([file for file in files if file.filename != ''])
 
         return jsonify({
             "success": True,
@@ -76,10 +59,14 @@ def upload_images():
 
 @media_bp.route('/create-collage', methods=['POST'])
 def create_collage_endpoint():
-    """Create collage from images."""
+    """
+    Create collage from images.
+    With preview=true a low-resolution preview is returned and nothing is uploaded.
+    """
     try:
         image_data_list = []
         layout = "feature"
+        preview = False
 
         if 'files' in request.files:
             files = request.files.getlist('files')
@@ -87,32 +74,33 @@ def create_collage_endpoint():
                 if file.filename:
                     image_data_list.append(file.read())
             layout = request.form.get('layout', 'feature')
+            preview = request.form.get('preview', 'false') == 'true'
         elif request.json and 'image_urls' in request.json:
-            for url in request.json['image_urls']:
-                response = requests.get(url, timeout=30)
-                response.raise_for_status()
-                image_data_list.append(response.content)
+            image_data_list = fetch_images(request.json['image_urls'])
             layout = request.json.get('layout', 'feature')
+            preview = bool(request.json.get('preview', False))
 
         if len(image_data_list) < 2:
             return jsonify({"error": "Collage requires at least 2 images"}), 400
 
-        collage_bytes = create_collage(image_data_list, layout=layout, gap=3)
+        collage = create_collage.encoded(image_data_list, layout=layout, gap=3, preview=preview)
+        collage_bytes = collage.data
         collage_base64 = base64.b64encode(collage_bytes).decode('utf-8')
 
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.jpg') as tmp:
-            tmp.write(collage_bytes)
-            tmp_path = tmp.name
-
-        collage_url = fal_client.upload_file(tmp_path)
-        os.unlink(tmp_path)
+        collage_url = None
+        if not preview:
+            collage_url = upload_bytes(collage_bytes, preset_mime_type("publish"))
 
         return jsonify({
             "success": True,
             "image_base64": collage_base64,
-            "image_url": collage_url
+            "image_url": collage_url,
+            "mime_type": preset_mime_type("preview" if preview else "publish"),
+            "encoding": collage.settings,
         })
 
+    except ImageFetchError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -145,93 +133,104 @@ def create_posters():
         if not image_data_list:
             return jsonify({"error": "No valid files found"}), 400
 
-        if ai_mode:
-            # NOTE: generate_ai_poster is not yet defined (existing bug)
-            from services.content import generate_ai_poster
-            result = generate_ai_poster(image_data_list, campaign)
-            poster_bytes = result["poster_bytes"]
-            raw_bytes = result.get("raw_bytes")
-        else:
-            raw_bytes = create_raw_collage(image_data_list)
-            poster_bytes = create_poster_from_multiple(
-                image_data_list,
-                campaign["title"],
-                campaign["discount"],
-            )
-
-        poster_base64 = base64.b64encode(poster_bytes).decode("utf-8")
-        raw_base64 = base64.b64encode(raw_bytes).decode("utf-8") if raw_bytes else None
-
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.jpg') as tmp:
-            tmp.write(poster_bytes)
-            tmp_path = tmp.name
-        poster_url = fal_client.upload_file(tmp_path)
-        os.unlink(tmp_path)
-
-        return jsonify({
-            "success": True,
-            "poster": {
-                "image_base64": poster_base64,
-                "image_url": poster_url,
-            },
-            "raw_image_base64": raw_base64,
-            "mode": "ai" if ai_mode else "basic",
-        })
+        return respond_with_job("posters", _create_posters_work, campaign, image_data_list, ai_mode)
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
+def _create_posters_work(report, campaign, image_data_list, ai_mode):
+    if ai_mode:
+        report("generate")
+        # NOTE: generate_ai_poster is not yet defined (existing bug)
+        from services.content import generate_ai_poster
+        result = generate_ai_poster(image_data_list, campaign)
+        poster_bytes = result["poster_bytes"]
+        raw_bytes = result.get("raw_bytes")
+        encoding = None
+    else:
+        report("render")
+        raw_bytes = create_raw_collage(image_data_list)
+        poster = create_poster_from_multiple.encoded(
+            image_data_list,
+            campaign["title"],
+            campaign["discount"],
+        )
+        poster_bytes, encoding = poster.data, poster.settings
+
+    poster_base64 = base64.b64encode(poster_bytes).decode("utf-8")
+    # The raw image stays server-side in the render session for /adjust-poster
+    session_id = create_session(raw_bytes, "ai" if ai_mode else "basic") if raw_bytes else None
+
+    report("upload")
+    poster_url = upload_bytes(poster_bytes, preset_mime_type("publish"))
+
+    return {
+        "success": True,
+        "poster": {
+            "image_base64": poster_base64,
+            "image_url": poster_url,
+            "mime_type": preset_mime_type("publish"),
+            "encoding": encoding,
+        },
+        "render_session_id": session_id,
+        "mode": "ai" if ai_mode else "basic",
+    }
+
+
 @media_bp.route('/adjust-poster', methods=['POST'])
 def adjust_poster():
-    """Adjust text position on poster and re-render."""
+    """
+    Re-render poster text on a prepared render session.
+
+    Send render_session_id (from /create-posters) plus text parameters.
+    The poster is uploaded to fal.ai only when commit is true; otherwise
+    only the preview is returned. raw_image_base64 is still accepted and
+    opens a new session.
+    """
     try:
         data = request.json
+        session_id = data.get('render_session_id')
         raw_base64 = data.get('raw_image_base64')
         campaign_id = int(data.get('campaign_id', 0))
         title_y_percent = int(data.get('title_y_percent', 58))
         mode = data.get('mode', 'ai')
+        commit = bool(data.get('commit', False))
 
-        if not raw_base64:
-            return jsonify({"error": "raw_image_base64 is required"}), 400
+        if not session_id and not raw_base64:
+            return jsonify({"error": "render_session_id or raw_image_base64 is required"}), 400
 
         campaign = next((c for c in load_campaigns() if c["id"] == campaign_id), None)
         if not campaign:
             return jsonify({"error": "Campaign not found"}), 404
 
-        raw_bytes = base64.b64decode(raw_base64)
+        if not session_id:
+            session_id = create_session(base64.b64decode(raw_base64), mode)
+
+        session = get_session(session_id)
+        if not session:
+            return jsonify({"error": "Render session expired, please preview again"}), 404
 
         title = data.get('title') or campaign["title"]
         discount = data.get('discount') or campaign["discount"]
 
-        if mode == 'ai':
-            poster_bytes = create_poster(
-                raw_bytes,
-                title,
-                discount,
-                title_y_percent=title_y_percent,
-            )
-        else:
-            poster_bytes = create_poster_from_multiple(
-                [raw_bytes],
-                title,
-                discount,
-                title_y_percent=title_y_percent,
-            )
-
+        # Full resolution only on commit; interactive changes get a preview render
+        poster = render_session(session, title, discount, title_y_percent, preview=not commit)
+        poster_bytes = poster.data
         poster_base64 = base64.b64encode(poster_bytes).decode("utf-8")
 
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.jpg') as tmp:
-            tmp.write(poster_bytes)
-            tmp_path = tmp.name
-        poster_url = fal_client.upload_file(tmp_path)
-        os.unlink(tmp_path)
+        poster_url = None
+        if commit:
+            poster_url = upload_bytes(poster_bytes, preset_mime_type("publish"))
 
         return jsonify({
             "success": True,
+            "render_session_id": session_id,
             "poster": {
                 "image_base64": poster_base64,
                 "image_url": poster_url,
+                "mime_type": preset_mime_type("publish" if commit else "preview"),
+                "encoding": poster.settings,
             },
         })
 
@@ -15,17 +15,15 @@ Flow:
 import os
 import json
 import sys
-import tempfile
-import re
 from datetime import datetime, timezone, timedelta
-from urllib.parse import urljoin
-
-import requests
-import fal_client
-from bs4 import BeautifulSoup
 
 from instagram import post_to_instagram
 from poster import create_poster, create_poster_from_multiple
+from services import http_client
+from services import fal_gateway
+from services.image_fetcher import fetch_images
+from services.uploads import upload_bytes
+from services.scraper import PageSnapshot, extract_campaign
 
 # fal.ai workflow endpoint
 WORKFLOW_ENDPOINT = "workflows/baharyavuz/grupanya-content-engine"
@@ -47,7 +45,7 @@ def load_campaigns_data():
     # 2) Private GitHub Gist (production - dynamic updates)
     gist_url = os.environ.get("CAMPAIGNS_GIST_URL")
     if gist_url:
-        resp = requests.get(gist_url, timeout=10)
+        resp = http_client.get(gist_url, timeout=10)
         resp.raise_for_status()
         return resp.json()
     # 3) Env var fallback
@@ -59,9 +57,10 @@ def load_campaigns_data():
     )
 
 
-def load_campaign_urls():
-    """Extract URL list from campaign data."""
-    data = load_campaigns_data()
+def load_campaign_urls(data=None):
+    """Extract URL list from campaign data (loaded when not given)."""
+    if data is None:
+        data = load_campaigns_data()
     # New format: list of objects ({"id": ..., "url": ..., ...})
     if data and isinstance(data[0], dict):
         return [c["url"] for c in data if c.get("url")]
@@ -91,141 +90,9 @@ def pick_url(urls):
     return urls[index], index
 
 
-def scrape_campaign_page(url):
-    """Scrape campaign page and return text content."""
-    headers = {
-        "User-Agent": (
-            "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
-            "AppleWebKit/537.36 (KHTML, like Gecko) "
-            "Chrome/120.0.0.0 Safari/537.36"
-        )
-    }
-    resp = requests.get(url, headers=headers, timeout=30)
-    resp.raise_for_status()
-
-    soup = BeautifulSoup(resp.text, "html.parser")
-
-    for tag in soup(["script", "style", "nav", "footer", "header"]):
-        tag.decompose()
-
-    title = soup.title.string.strip() if soup.title and soup.title.string else ""
-
-    meta_desc = ""
-    meta_tag = soup.find("meta", attrs={"name": "description"})
-    if meta_tag and meta_tag.get("content"):
-        meta_desc = meta_tag["content"].strip()
-
-    body_text = soup.get_text(separator="\n", strip=True)
-    if len(body_text) > 4000:
-        body_text = body_text[:4000]
-
-    return f"Sayfa Basligi: {title}\nMeta Aciklama: {meta_desc}\n\nSayfa Icerigi:\n{body_text}"
-
-
-def scrape_campaign_images(url, max_images=3):
-    """
-    Extract image URLs from campaign page.
-    Grupanya images are located under grpstat.com/DealImages/.
-    Prefers large-sized images (766-511).
-    """
-    headers = {
-        "User-Agent": (
-            "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
-            "AppleWebKit/537.36 (KHTML, like Gecko) "
-            "Chrome/120.0.0.0 Safari/537.36"
-        )
-    }
-    resp = requests.get(url, headers=headers, timeout=30)
-    resp.raise_for_status()
-
-    soup = BeautifulSoup(resp.text, "html.parser")
-
-    image_urls = []
-    seen = set()
-
-    for img in soup.find_all("img"):
-        src = img.get("src") or img.get("data-src") or ""
-        if not src:
-            continue
-
-        # Convert to absolute URL
-        src = urljoin(url, src)
-
-        # Grupanya campaign images: grpstat.com/DealImages/
-        if "DealImages" not in src and "dealimages" not in src.lower():
-            continue
-
-        # Skip small thumbnails (e.g. 127-85)
-        if re.search(r'_\d{2,3}-\d{2,3}\.', src):
-            if "_127-85" in src or "_85-85" in src:
-                continue
-
-        # Prevent different sizes of the same image
-        # Base key: without size info
-        base_key = re.sub(r'_?\d{3,4}-\d{3,4}', '', src)
-        if base_key in seen:
-            continue
-        seen.add(base_key)
-
-        image_urls.append(src)
-
-        if len(image_urls) >= max_images:
-            break
-
-    return image_urls
-
-
-def download_image(url):
-    """Download image, return bytes."""
-    resp = requests.get(url, timeout=60)
-    resp.raise_for_status()
-    return resp.content
-
-
 def upload_to_fal(image_bytes):
     """Upload image bytes to fal.ai, return public URL."""
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".jpg") as tmp:
-        tmp.write(image_bytes)
-        tmp_path = tmp.name
-    url = fal_client.upload_file(tmp_path)
-    os.unlink(tmp_path)
-    return url
-
-
-def extract_campaign_info(page_content):
-    """Extract campaign info from page content using AI."""
-    system_prompt = """Sen bir kampanya analiz asistanisin. Sana verilen web sayfasi iceriginden kampanya bilgilerini cikarmalsin.
-
-Yanitini SADECE asagidaki JSON formatinda ver, baska hicbir sey yazma:
-{
-    "title": "Kampanya basligi (isletme adi + firsat ozeti, Turkce)",
-    "category": "Kampanyanin kategorisini Ingilizce olarak yaz. Bu alan gorsel olusturmak icin kullanilacak, o yuzden gorselde ne olmasi gerektigini detayli anlat. Ornek: 'luxury spa massage therapy', 'fresh fruits and vegetables market'",
-    "discount": "Indirim miktari veya fiyat bilgisi (orn: '%30', '150 TL', '2.750 TL'den baslayan fiyatlarla')"
-}"""
-
-    result = fal_client.subscribe(
-        "fal-ai/any-llm",
-        arguments={
-            "model": "openai/gpt-4o",
-            "prompt": f"Asagidaki kampanya sayfasinin icerigini analiz et ve kampanya bilgilerini JSON olarak cikar:\n\n{page_content}",
-            "system_prompt": system_prompt,
-        },
-    )
-
-    raw_output = result.get("output", "")
-
-    json_str = raw_output.strip()
-    if "```json" in json_str:
-        json_str = json_str.split("```json")[1].split("```")[0].strip()
-    elif "```" in json_str:
-        json_str = json_str.split("```")[1].split("```")[0].strip()
-
-    start = json_str.find("{")
-    end = json_str.rfind("}") + 1
-    if start != -1 and end > start:
-        json_str = json_str[start:end]
-
-    return json.loads(json_str)
+    return upload_bytes(image_bytes)
 
 
 DEFAULT_NEGATIVE_PROMPT = (
@@ -251,7 +118,7 @@ def generate_content_ai(campaign):
         "Instagram post metni yaz."
     )
 
-    handler = fal_client.submit(
+    result = fal_gateway.run(
         WORKFLOW_ENDPOINT,
         arguments={
             "image_prompt": image_prompt,
@@ -259,7 +126,6 @@ def generate_content_ai(campaign):
             "system_prompt": system_prompt,
         },
     )
-    result = handler.get()
 
     images = result.get("images", [])
     post_text = result.get("output", "")
@@ -279,7 +145,7 @@ def generate_content_ai(campaign):
 
 def generate_post_text(campaign):
     """Generate Instagram post text with AI."""
-    result = fal_client.subscribe(
+    result = fal_gateway.run(
         "fal-ai/any-llm",
         arguments={
             "model": "openai/gpt-4o",
@@ -307,8 +173,9 @@ def run():
         print(f"ERROR: Missing environment variables: {', '.join(missing)}")
         sys.exit(1)
 
-    # Load URL list
-    urls = load_campaign_urls()
+    # Load campaign data and URL list
+    campaigns_data = load_campaigns_data()
+    urls = load_campaign_urls(campaigns_data)
     if not urls:
         print("ERROR: campaigns.json is empty or not found.")
         sys.exit(1)
@@ -318,33 +185,38 @@ def run():
     now = datetime.now(TZ_TR).strftime("%Y-%m-%d %H:%M")
     print(f"[{now}] Selected URL ({index + 1}/{len(urls)}): {url}")
 
-    # Scrape page
+    # Stored entry for this URL (category, negative_prompt), if any
+    matched = None
+    if campaigns_data and isinstance(campaigns_data[0], dict):
+        matched = next((c for c in campaigns_data if c.get("url") == url), None)
+
+    # Scrape page (one fetch + parse for text and images)
     print("Scraping page...")
-    page_content = scrape_campaign_page(url)
+    page = PageSnapshot.fetch(url)
 
-    # Extract campaign info with AI
+    # Extract campaign info: structured data first, AI for the rest;
+    # the stored category is reused instead of asking the LLM again
     print("Extracting campaign info...")
-    campaign = extract_campaign_info(page_content)
+    campaign, extraction = extract_campaign(
+        page, known={"category": (matched or {}).get("category")}, model="openai/gpt-4o"
+    )
+    print(f"Extraction path: {extraction}")
     # Add negative_prompt from campaigns.json (if exists)
-    campaigns_data = load_campaigns_data()
-    if campaigns_data and isinstance(campaigns_data[0], dict):
-        matched = next((c for c in campaigns_data if c.get("url") == url), None)
-        if matched and matched.get("negative_prompt"):
-            campaign["negative_prompt"] = matched["negative_prompt"]
+    if matched and matched.get("negative_prompt"):
+        campaign["negative_prompt"] = matched["negative_prompt"]
     print(f"Campaign: {campaign['title']} | {campaign['discount']}")
 
     # Check page images
     print("Searching for campaign images...")
-    image_urls = scrape_campaign_images(url)
+    image_urls = page.image_urls()
 
     if image_urls:
         # POSTER MODE: Create poster using page images
         print(f"{len(image_urls)} images found, poster mode...")
 
-        image_data_list = []
         for img_url in image_urls:
             print(f"  Downloading: {img_url[:80]}...")
-            image_data_list.append(download_image(img_url))
+        image_data_list = fetch_images(image_urls)
 
         # Create poster
         if len(image_data_list) == 1:
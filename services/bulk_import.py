@@ -0,0 +1,167 @@
+"""
+Bulk campaign import.
+
+Scrapes and extracts many campaign URLs concurrently and adds all new
+campaigns to campaigns.json in a single write:
+- Page fetches run on FETCH_WORKERS threads, at most PER_HOST_LIMIT at a
+  time per host and at least PER_HOST_INTERVAL seconds apart per host.
+- Extraction (structured data first, LLM for the rest) runs at most
+  LLM_WORKERS at a time.
+- URLs already in campaigns.json or repeated in the input are skipped.
+
+CLI:
+    python -m services.bulk_import urls.txt
+
+urls.txt has one URL per line (or is a JSON list of URLs).
+"""
+import sys
+import json
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, List, Optional
+from urllib.parse import urlsplit
+
+from services.campaigns import load_campaigns, save_campaigns, DEFAULT_NEGATIVE_PROMPT
+from services.scraper import PageSnapshot, extract_campaign
+
+FETCH_WORKERS = 8
+LLM_WORKERS = 4
+PER_HOST_LIMIT = 2
+PER_HOST_INTERVAL = 0.5
+
+_llm_slots = threading.BoundedSemaphore(LLM_WORKERS)
+
+
+class _HostGate:
+    """Per-host concurrency limit plus a minimum interval between request starts."""
+
+    def __init__(self):
+        self.slots = threading.BoundedSemaphore(PER_HOST_LIMIT)
+        self.lock = threading.Lock()
+        self.next_start = 0.0
+
+    def __enter__(self):
+        self.slots.acquire()
+        with self.lock:
+            now = time.monotonic()
+            wait = self.next_start - now
+            self.next_start = max(now, self.next_start) + PER_HOST_INTERVAL
+        if wait > 0:
+            time.sleep(wait)
+        return self
+
+    def __exit__(self, *exc):
+        self.slots.release()
+
+
+def _import_one(url: str, gates: Dict[str, _HostGate], gates_lock: threading.Lock) -> dict:
+    host = urlsplit(url).netloc.lower()
+    with gates_lock:
+        gate = gates.setdefault(host, _HostGate())
+
+    with gate:
+        page = PageSnapshot.fetch(url)
+    with _llm_slots:
+        info, extraction = extract_campaign(page)
+    return {"info": info, "extraction": extraction}
+
+
+def import_campaigns(
+    urls: List[str],
+    on_progress: Optional[Callable[[int, int, dict], None]] = None,
+) -> dict:
+    """
+    Import campaigns from URLs concurrently, saving once at the end.
+
+    Args:
+        urls: Campaign page URLs
+        on_progress: Called as fn(done, total, result) after each URL
+
+    Returns:
+        dict: results (one per input URL, in input order, each with url,
+        status "added" / "skipped" / "failed" and campaign / error),
+        plus added / skipped / failed counts
+    """
+    existing = {c.get("url") for c in load_campaigns()}
+    results = []
+    pending = {}
+    for url in (u.strip() for u in urls):
+        if not url:
+            continue
+        if url in existing or url in pending:
+            results.append({"url": url, "status": "skipped", "error": "Already added"})
+            continue
+        pending[url] = {"url": url}
+        results.append(pending[url])
+
+    gates: Dict[str, _HostGate] = {}
+    gates_lock = threading.Lock()
+    done = 0
+    total = len(pending)
+
+    with ThreadPoolExecutor(max_workers=FETCH_WORKERS) as pool:
+        futures = {pool.submit(_import_one, url, gates, gates_lock): url for url in pending}
+        for future in as_completed(futures):
+            result = pending[futures[future]]
+            try:
+                result.update(future.result(), status="added")
+            except Exception as e:
+                result.update(status="failed", error=str(e))
+            done += 1
+            if on_progress:
+                on_progress(done, total, result)
+
+    # Single write, ids in input order
+    campaigns = load_campaigns()
+    next_id = max((c["id"] for c in campaigns), default=0) + 1
+    for result in results:
+        if result.get("status") != "added":
+            continue
+        info = result.pop("info")
+        campaign = {
+            "id": next_id,
+            "url": result["url"],
+            "title": info["title"],
+            "category": info["category"],
+            "discount": info["discount"],
+            "negative_prompt": DEFAULT_NEGATIVE_PROMPT,
+        }
+        campaigns.append(campaign)
+        result["campaign"] = campaign
+        next_id += 1
+    if any(r["status"] == "added" for r in results):
+        save_campaigns(campaigns)
+
+    counts = {status: sum(r["status"] == status for r in results) for status in ("added", "skipped", "failed")}
+    return {"results": results, **counts}
+
+
+def _read_urls(path: str) -> List[str]:
+    with open(path, "r", encoding="utf-8") as f:
+        content = f.read()
+    if content.lstrip().startswith("["):
+        return json.loads(content)
+    return [line for line in content.splitlines() if line.strip() and not line.startswith("#")]
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) != 1:
+        print("Usage: python -m services.bulk_import urls.txt")
+        sys.exit(2)
+
+    def progress(done, total, result):
+        if result["status"] == "added":
+            print(f"[{done}/{total}] OK ({result['extraction']}) {result['url']}")
+        else:
+            print(f"[{done}/{total}] FAILED {result['url']}: {result['error']}")
+
+    summary = import_campaigns(_read_urls(argv[0]), on_progress=progress)
+    print(f"Added: {summary['added']}, skipped: {summary['skipped']}, failed: {summary['failed']}")
+    if summary["failed"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""
+Single gateway for fal.ai queue calls.
+
+All model and workflow calls (LLM extraction, captions, style prompts,
+img2img, image workflows) go through here instead of calling
+fal_client.subscribe / submit(...).get() directly:
+- submit() returns a FalJob immediately; the request is submitted and
+  polled on a shared worker pool, so several jobs can be in flight while
+  the caller does other work.
+- At most FAL_MAX_CONCURRENCY jobs run at once across the whole process,
+  and submissions are spaced to FAL_MAX_SUBMITS_PER_SECOND.
+- Each job records its queue time (submitted -> running) separately from
+  its run time (running -> completed).
+
+    job = submit("fal-ai/any-llm", {...})
+    other = submit(WORKFLOW_ENDPOINT, {...})
+    for done in as_completed([job, other]):
+        done.result()
+
+Environment:
+    FAL_MAX_CONCURRENCY         Jobs in flight at once (default 8)
+    FAL_MAX_SUBMITS_PER_SECOND  Submission rate limit (default 5)
+"""
+import os
+import time
+import threading
+import concurrent.futures
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional
+
+import fal_client
+
+FAL_MAX_CONCURRENCY = int(os.getenv("FAL_MAX_CONCURRENCY", "8"))
+FAL_MAX_SUBMITS_PER_SECOND = float(os.getenv("FAL_MAX_SUBMITS_PER_SECOND", "5"))
+POLL_INTERVAL = 0.5
+
+_pool = ThreadPoolExecutor(max_workers=FAL_MAX_CONCURRENCY, thread_name_prefix="fal")
+_rate_lock = threading.Lock()
+_next_submit = 0.0
+
+_stats_lock = threading.Lock()
+_stats = {"submitted": 0, "completed": 0, "failed": 0, "queue_seconds": 0.0, "run_seconds": 0.0}
+
+
+class FalJob:
+    """A fal.ai request in flight. result() blocks until it is done."""
+
+    def __init__(self, application: str, arguments: Dict[str, Any]):
+        self.application = application
+        self.arguments = arguments
+        self.request_id: Optional[str] = None
+        self.created_at = time.monotonic()
+        self.submitted_at: Optional[float] = None
+        self.started_at: Optional[float] = None
+        self.completed_at: Optional[float] = None
+        self._future: Optional[concurrent.futures.Future] = None
+
+    @property
+    def queue_seconds(self) -> Optional[float]:
+        """Time spent in fal's queue before running."""
+        if self.submitted_at is None or self.started_at is None:
+            return None
+        return self.started_at - self.submitted_at
+
+    @property
+    def run_seconds(self) -> Optional[float]:
+        """Inference time once running."""
+        if self.started_at is None or self.completed_at is None:
+            return None
+        return self.completed_at - self.started_at
+
+    def done(self) -> bool:
+        return self._future.done()
+
+    def result(self, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """The model output; re-raises the request's error."""
+        return self._future.result(timeout)
+
+    def __repr__(self):
+        return f"FalJob({self.application!r}, request_id={self.request_id!r})"
+
+
+def _wait_for_rate_limit():
+    global _next_submit
+    if FAL_MAX_SUBMITS_PER_SECOND <= 0:
+        return
+    with _rate_lock:
+        now = time.monotonic()
+        wait = _next_submit - now
+        _next_submit = max(now, _next_submit) + 1 / FAL_MAX_SUBMITS_PER_SECOND
+    if wait > 0:
+        time.sleep(wait)
+
+
+def _run(job: FalJob) -> Dict[str, Any]:
+    try:
+        _wait_for_rate_limit()
+        handle = fal_client.submit(job.application, arguments=job.arguments)
+        job.request_id = handle.request_id
+        job.submitted_at = time.monotonic()
+        with _stats_lock:
+            _stats["submitted"] += 1
+
+        for status in handle.iter_events(interval=POLL_INTERVAL):
+            if isinstance(status, fal_client.Queued):
+                continue
+            if job.started_at is None:
+                job.started_at = time.monotonic()
+        job.completed_at = time.monotonic()
+        result = handle.get()
+    except Exception:
+        with _stats_lock:
+            _stats["failed"] += 1
+        raise
+
+    with _stats_lock:
+        _stats["completed"] += 1
+        _stats["queue_seconds"] += job.queue_seconds or 0.0
+        _stats["run_seconds"] += job.run_seconds or 0.0
+    return result
+
+
+def submit(application: str, arguments: Dict[str, Any]) -> FalJob:
+    """Queue a fal.ai request without blocking; returns its FalJob."""
+    job = FalJob(application, arguments)
+    job._future = _pool.submit(_run, job)
+    return job
+
+
+def run(application: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
+    """Submit and wait for the result (drop-in for fal_client.subscribe)."""
+    return submit(application, arguments).result()
+
+
+def as_completed(jobs: List[FalJob], timeout: Optional[float] = None) -> Iterator[FalJob]:
+    """Yield jobs as they finish (successfully or not)."""
+    by_future = {job._future: job for job in jobs}
+    for future in concurrent.futures.as_completed(by_future, timeout=timeout):
+        yield by_future[future]
+
+
+def wait_all(jobs: List[FalJob], timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+    """Results of all jobs, in order; raises the first error."""
+    concurrent.futures.wait([job._future for job in jobs], timeout=timeout)
+    return [job.result(0) for job in jobs]
+
+
+def gateway_stats() -> Dict[str, Any]:
+    """Submitted / completed / failed counts and average queue and run seconds."""
+    with _stats_lock:
+        stats = dict(_stats)
+    completed = stats["completed"] or 1
+    stats["avg_queue_seconds"] = stats.pop("queue_seconds") / completed
+    stats["avg_run_seconds"] = stats.pop("run_seconds") / completed
+    return stats
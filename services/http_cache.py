@@ -0,0 +1,132 @@
+"""
+Persistent conditional-GET cache for campaign pages.
+
+Page bodies are stored on disk (disk_cache.DiskCache) with their ETag and
+Last-Modified headers. A refresh sends If-None-Match / If-Modified-Since,
+so an unchanged page costs a 304 instead of a full download. Callers can
+also store a parsed form of the page with the entry (parse=...), which is
+reused on 304 so unchanged pages are not parsed again either.
+
+Entries are written atomically (DiskCache writes a temp file and renames
+it). An entry that still fails to load, e.g. truncated by a partially
+restored cache directory, is deleted and the page is fetched again.
+
+The cache directory can be restored between GitHub Actions runs
+(see .github/workflows/schedule.yml).
+
+Environment:
+    HTTP_CACHE_DIR        Cache directory (default .cache/http, empty disables)
+    HTTP_CACHE_MAX_BYTES  Size bound for LRU eviction (default 100MB)
+    HTTP_CACHE_TTL        Seconds an entry is kept for revalidation (default 7 days)
+"""
+import os
+import hashlib
+from typing import Any, Callable, Dict, NamedTuple, Optional
+
+from disk_cache import DiskCache
+from services import http_client
+
+HTTP_CACHE_DIR = os.getenv("HTTP_CACHE_DIR", ".cache/http")
+HTTP_CACHE_MAX_BYTES = int(os.getenv("HTTP_CACHE_MAX_BYTES", str(100 * 1024 * 1024)))
+HTTP_CACHE_TTL = int(os.getenv("HTTP_CACHE_TTL", str(7 * 24 * 3600)))
+
+_cache: Optional[DiskCache] = (
+    DiskCache(HTTP_CACHE_DIR, HTTP_CACHE_MAX_BYTES, ttl=HTTP_CACHE_TTL) if HTTP_CACHE_DIR else None
+)
+
+
+class CachedPage(NamedTuple):
+    text: str
+    parsed: Any
+    # "downloaded" (200), "not_modified" (304, served from cache) or "uncached"
+    status: str
+
+
+def _key(url: str) -> str:
+    return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+
+def fetch_page(
+    url: str,
+    headers: Optional[Dict[str, str]] = None,
+    timeout: float = 30,
+    parse: Optional[Callable[[str], Any]] = None,
+    parse_version: str = "",
+) -> CachedPage:
+    """
+    GET a page, revalidating a cached copy when there is one.
+
+    Args:
+        url: Page URL
+        headers: Extra request headers (User-Agent, ...)
+        timeout: Request timeout in seconds
+        parse: Optional fn(text) -> JSON-able value, stored with the entry
+        parse_version: Stored parse results with another version are recomputed
+
+    Returns:
+        CachedPage(text, parsed, status)
+    """
+    headers = dict(headers or {})
+    entry = _load(url) if _cache else None
+
+    if entry:
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+
+    resp = http_client.get(url, headers=headers, timeout=timeout)
+
+    if entry and resp.status_code == 304:
+        if parse and entry.get("parse_version") != parse_version:
+            entry["parsed"] = parse(entry["text"])
+            entry["parse_version"] = parse_version
+        # Rewrite to restart the TTL: the server confirmed the copy is current
+        _store(url, entry)
+        return CachedPage(entry["text"], entry.get("parsed"), "not_modified")
+
+    resp.raise_for_status()
+    text = resp.text
+    parsed = parse(text) if parse else None
+
+    if _cache is None:
+        return CachedPage(text, parsed, "uncached")
+
+    _store(url, {
+        "url": url,
+        "etag": resp.headers.get("ETag"),
+        "last_modified": resp.headers.get("Last-Modified"),
+        "text": text,
+        "parsed": parsed,
+        "parse_version": parse_version,
+    })
+    return CachedPage(text, parsed, "downloaded")
+
+
+def _load(url: str) -> Optional[Dict[str, Any]]:
+    """Cached entry for url; a corrupt one is deleted and treated as a miss."""
+    try:
+        entry = _cache.get_json(_key(url))
+    except ValueError as e:  # JSONDecodeError, UnicodeDecodeError
+        print(f"HTTP cache entry for {url} is corrupt, refetching: {e}")
+        _cache.delete(_key(url))
+        return None
+    if entry is not None and not (isinstance(entry, dict) and isinstance(entry.get("text"), str)):
+        print(f"HTTP cache entry for {url} is malformed, refetching")
+        _cache.delete(_key(url))
+        return None
+    return entry
+
+
+def _store(url: str, entry: Dict[str, Any]):
+    try:
+        _cache.set_json(_key(url), entry)
+    except OSError as e:
+        print(f"HTTP cache write failed: {e}")
+
+
+def http_cache_info() -> Dict[str, Any]:
+    """HTTP cache statistics: hits, misses, writes, evictions, entries, bytes."""
+    if _cache is None:
+        return {"enabled": False}
+    return {"enabled": True, "directory": HTTP_CACHE_DIR, **_cache.stats()}
@@ -0,0 +1,158 @@
+"""
+Shared pooled HTTP client.
+
+Every outbound HTTP call (Graph API, campaign pages, grpstat images, fal
+result downloads) goes through one requests.Session, so connections and
+TLS sessions are kept alive per host instead of being re-established on
+every call.
+
+- Timeouts: (connect, read) defaults from the environment, applied to
+  every request that does not pass its own.
+- Retries: idempotent methods (GET/HEAD/OPTIONS) are retried with
+  exponential backoff on connection errors and 429/5xx responses
+  (honouring Retry-After). POST is never retried after it was sent.
+- Streaming: download() / download_to() read bodies in chunks, with an
+  optional byte cap.
+- Timing hooks: add_timing_hook(fn) is called with (method, url, status,
+  seconds) for every response; per-host totals are in request_stats().
+
+Environment:
+    HTTP_CONNECT_TIMEOUT  Seconds (default 5)
+    HTTP_READ_TIMEOUT     Seconds (default 30)
+    HTTP_RETRIES          Retries for idempotent requests (default 3)
+"""
+import os
+import threading
+from typing import Callable, Dict, List, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))
+READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "30"))
+DEFAULT_TIMEOUT = (CONNECT_TIMEOUT, READ_TIMEOUT)
+
+RETRIES = int(os.getenv("HTTP_RETRIES", "3"))
+# Host pools kept / keep-alive connections per host
+POOL_CONNECTIONS = 16
+POOL_MAXSIZE = 16
+CHUNK_SIZE = 64 * 1024
+
+RETRY_POLICY = Retry(
+    total=RETRIES,
+    backoff_factor=0.5,
+    status_forcelist=(429, 500, 502, 503, 504),
+    allowed_methods=frozenset({"GET", "HEAD", "OPTIONS"}),
+    respect_retry_after_header=True,
+    raise_on_status=False,
+)
+
+_timing_hooks: List[Callable[[str, str, int, float], None]] = []
+_stats: Dict[str, Dict[str, float]] = {}
+_stats_lock = threading.Lock()
+
+
+class DownloadTooLargeError(ValueError):
+    """Response body exceeds the byte cap."""
+
+
+def _on_response(response, *args, **kwargs):
+    """requests response hook: per-host stats + registered timing hooks."""
+    seconds = response.elapsed.total_seconds()
+    method = response.request.method
+    host = urlsplit(response.url).netloc
+    with _stats_lock:
+        stats = _stats.setdefault(host, {"requests": 0, "seconds": 0.0, "errors": 0})
+        stats["requests"] += 1
+        stats["seconds"] += seconds
+        if response.status_code >= 400:
+            stats["errors"] += 1
+    for hook in list(_timing_hooks):
+        hook(method, response.url, response.status_code, seconds)
+
+
+def _create_session() -> requests.Session:
+    s = requests.Session()
+    adapter = HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE, max_retries=RETRY_POLICY)
+    s.mount("http://", adapter)
+    s.mount("https://", adapter)
+    s.hooks["response"].append(_on_response)
+    return s
+
+
+session = _create_session()
+
+
+def request(method: str, url: str, **kwargs) -> requests.Response:
+    """session.request with the default timeout."""
+    kwargs.setdefault("timeout", DEFAULT_TIMEOUT)
+    return session.request(method, url, **kwargs)
+
+
+def get(url: str, **kwargs) -> requests.Response:
+    return request("GET", url, **kwargs)
+
+
+def post(url: str, **kwargs) -> requests.Response:
+    return request("POST", url, **kwargs)
+
+
+def iter_download(url: str, max_bytes: Optional[int] = None, chunk_size: int = CHUNK_SIZE,
+                  check_head: Optional[Callable[[bytes, requests.Response], None]] = None, **kwargs):
+    """
+    Stream a GET response body in chunks.
+
+    check_head(first_chunk, response), when given, runs before anything is
+    yielded (e.g. a magic-byte check); it aborts the download by raising.
+
+    Raises:
+        requests.HTTPError: non-2xx response
+        DownloadTooLargeError: body (or Content-Length) over max_bytes
+    """
+    with get(url, stream=True, **kwargs) as resp:
+        resp.raise_for_status()
+        length = resp.headers.get("Content-Length")
+        if max_bytes and length and length.isdigit() and int(length) > max_bytes:
+            raise DownloadTooLargeError(f"Response too large ({length} bytes): {url}")
+
+        total = 0
+        for chunk in resp.iter_content(chunk_size):
+            if check_head and not total:
+                check_head(chunk, resp)
+            total += len(chunk)
+            if max_bytes and total > max_bytes:
+                raise DownloadTooLargeError(f"Response larger than {max_bytes} bytes: {url}")
+            yield chunk
+
+
+def download(url: str, max_bytes: Optional[int] = None, **kwargs) -> bytes:
+    """Download a response body into memory (streamed, optional byte cap)."""
+    return b"".join(iter_download(url, max_bytes, **kwargs))
+
+
+def download_to(url: str, path, max_bytes: Optional[int] = None, **kwargs) -> int:
+    """Stream a response body to a file. Returns the number of bytes written."""
+    written = 0
+    with open(path, "wb") as f:
+        for chunk in iter_download(url, max_bytes, **kwargs):
+            f.write(chunk)
+            written += len(chunk)
+    return written
+
+
+def add_timing_hook(hook: Callable[[str, str, int, float], None]):
+    """Register fn(method, url, status, seconds), called after every response."""
+    _timing_hooks.append(hook)
+
+
+def remove_timing_hook(hook: Callable[[str, str, int, float], None]):
+    if hook in _timing_hooks:
+        _timing_hooks.remove(hook)
+
+
+def request_stats() -> Dict[str, Dict[str, float]]:
+    """Per-host request count, total seconds (time to response headers) and error count."""
+    with _stats_lock:
+        return {host: dict(stats) for host, stats in _stats.items()}
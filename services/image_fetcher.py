@@ -0,0 +1,122 @@
+"""
+Concurrent, pooled image downloads.
+
+All image URLs (collage sources, scraped campaign images) are fetched
+with http_client.iter_download, the shared bounded-download path over the
+pooled session (services/http_client.py):
+- Downloads run concurrently, with at most MAX_PER_HOST connections per
+  host, so N images take about as long as the slowest one.
+- Bodies are streamed and aborted as soon as they exceed MAX_IMAGE_BYTES
+  (Content-Length is checked first when the server sends it).
+- The first bytes are sniffed for a known image signature, so HTML error
+  pages and other non-images are rejected before anything is decoded.
+"""
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+
+import requests
+
+from services import http_client
+
+# Largest accepted image download
+MAX_IMAGE_BYTES = int(os.getenv("MAX_IMAGE_BYTES", str(20 * 1024 * 1024)))
+# Concurrent downloads in total / per host
+MAX_WORKERS = 8
+MAX_PER_HOST = 4
+TIMEOUT = 30
+CHUNK_SIZE = 64 * 1024
+
+_host_slots: Dict[str, threading.BoundedSemaphore] = {}
+_host_lock = threading.Lock()
+
+
+class ImageFetchError(RuntimeError):
+    """Image could not be downloaded, is too large or is not an image."""
+
+
+def _host_slot(url: str) -> threading.BoundedSemaphore:
+    host = urlsplit(url).netloc.lower()
+    with _host_lock:
+        if host not in _host_slots:
+            _host_slots[host] = threading.BoundedSemaphore(MAX_PER_HOST)
+        return _host_slots[host]
+
+
+def sniff_image_type(head: bytes) -> Optional[str]:
+    """Image format from magic bytes ("jpeg", "png", ...) or None."""
+    if head.startswith(b"\xff\xd8\xff"):
+        return "jpeg"
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "png"
+    if head[:6] in (b"GIF87a", b"GIF89a"):
+        return "gif"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "webp"
+    if head.startswith(b"BM"):
+        return "bmp"
+    if head[:4] in (b"II*\x00", b"MM\x00*"):
+        return "tiff"
+    return None
+
+
+def _check_image_head(url: str):
+    """iter_download check_head hook: reject bodies without an image signature."""
+    def check(head: bytes, resp: requests.Response):
+        if sniff_image_type(head) is None:
+            content_type = resp.headers.get("Content-Type", "unknown")
+            raise ImageFetchError(f"Not an image ({content_type}): {url}")
+    return check
+
+
+def fetch_image(url: str, max_bytes: Optional[int] = None, timeout: float = TIMEOUT) -> bytes:
+    """
+    Download one image.
+
+    Raises:
+        ImageFetchError: HTTP error, body over max_bytes, or not an image
+    """
+    max_bytes = max_bytes or MAX_IMAGE_BYTES
+    with _host_slot(url):
+        try:
+            data = b"".join(http_client.iter_download(
+                url, max_bytes, CHUNK_SIZE, check_head=_check_image_head(url), timeout=timeout,
+            ))
+        except http_client.DownloadTooLargeError as e:
+            raise ImageFetchError(f"Image too large: {e}") from e
+        except requests.RequestException as e:
+            raise ImageFetchError(f"Image download failed: {url}: {e}") from e
+
+    if not data:
+        raise ImageFetchError(f"Empty response: {url}")
+    return data
+
+
+def fetch_images(urls: List[str], max_bytes: Optional[int] = None, return_exceptions: bool = False) -> list:
+    """
+    Download images concurrently, results in the order of urls.
+
+    Args:
+        urls: Image URLs
+        max_bytes: Per-image byte cap (default MAX_IMAGE_BYTES)
+        return_exceptions: Put the ImageFetchError in place of a failed
+                           image instead of raising the first failure
+
+    Returns:
+        list of bytes (or ImageFetchError when return_exceptions=True)
+    """
+    if not urls:
+        return []
+
+    def fetch(url):
+        try:
+            return fetch_image(url, max_bytes)
+        except ImageFetchError as e:
+            if return_exceptions:
+                return e
+            raise
+
+    with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(urls))) as pool:
+        return list(pool.map(fetch, urls))
@@ -0,0 +1,193 @@
+"""
+In-process background jobs for long generation requests.
+
+Routes that wait on fal.ai (tens of seconds) can hand the work to a
+worker pool and return a job id right away, so request threads stay free:
+
+    job = submit_job("generate", work, campaign)
+    return jsonify(job.summary()), 202
+
+The work function is called as work(report, *args) and returns a
+JSON-serializable result. It calls report(stage, detail) as it moves
+through the pipeline stages (scrape, llm, generate, render, upload).
+Every report is stored as an event, which /jobs/<id>/events streams to
+the dashboard.
+
+Finished jobs are kept for JOB_TTL seconds (at most MAX_JOBS jobs).
+Results hold base64 images, so their total size is capped as well: over
+JOB_RESULT_MAX_BYTES the oldest results are dropped first and their jobs
+report result_expired.
+
+Environment:
+    JOB_WORKERS           Jobs running at once (default 4)
+    JOB_TTL               Seconds a finished job is kept (default 600)
+    JOB_RESULT_MAX_BYTES  Total size of kept results (default 64MB)
+"""
+import os
+import time
+import uuid
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+JOB_TTL = int(os.getenv("JOB_TTL", "600"))
+JOB_RESULT_MAX_BYTES = int(os.getenv("JOB_RESULT_MAX_BYTES", str(64 * 1024 * 1024)))
+MAX_JOBS = 50
+
+STAGES = ("scrape", "llm", "generate", "render", "upload")
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+_pool = ThreadPoolExecutor(max_workers=JOB_WORKERS, thread_name_prefix="job")
+_jobs: Dict[str, "Job"] = {}
+_lock = threading.Lock()
+
+
+class Job:
+    """A background job: status, current stage, progress events and result."""
+
+    def __init__(self, kind: str):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.status = QUEUED
+        self.stage: Optional[str] = None
+        self.events: List[Dict[str, Any]] = []
+        self.result: Any = None
+        self.result_bytes = 0
+        self.result_expired = False
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+        self._changed = threading.Condition()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (SUCCEEDED, FAILED)
+
+    def _update(self, **fields):
+        with self._changed:
+            for name, value in fields.items():
+                setattr(self, name, value)
+            self.events.append({"status": self.status, "stage": self.stage, "detail": None, "time": time.time()})
+            self._changed.notify_all()
+
+    def report(self, stage: str, detail: Optional[str] = None):
+        """Record that the job entered a stage (detail: e.g. "2/4 images")."""
+        if stage not in STAGES:
+            raise ValueError(f"Unknown job stage: {stage}")
+        with self._changed:
+            self.stage = stage
+            self.events.append({"status": self.status, "stage": stage, "detail": detail, "time": time.time()})
+            self._changed.notify_all()
+
+    def wait_for_events(self, seen: int, timeout: float) -> List[Dict[str, Any]]:
+        """Events after the first `seen`, waiting up to timeout seconds for one."""
+        with self._changed:
+            self._changed.wait_for(lambda: len(self.events) > seen or self.finished, timeout)
+            return self.events[seen:]
+
+    def summary(self) -> Dict[str, Any]:
+        """Status without the result (for 202 responses and progress streams)."""
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "stage": self.stage,
+            "error": self.error,
+            "status_url": f"/jobs/{self.id}",
+            "events_url": f"/jobs/{self.id}/events",
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = self.summary()
+        data["events"] = list(self.events)
+        if self.status == SUCCEEDED:
+            data["result"] = self.result
+            data["result_expired"] = self.result_expired
+        return data
+
+
+def _payload_size(value: Any) -> int:
+    """Approximate size of a JSON-like result (strings and bytes dominate)."""
+    if isinstance(value, (str, bytes)):
+        return len(value)
+    if isinstance(value, dict):
+        return sum(_payload_size(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return sum(_payload_size(v) for v in value)
+    return 8
+
+
+def _evict(now):
+    """
+    Drop finished jobs past JOB_TTL and the oldest finished ones over
+    MAX_JOBS, then results over JOB_RESULT_MAX_BYTES (caller holds _lock).
+    """
+    for job_id, job in list(_jobs.items()):
+        if job.finished and now - job.finished_at > JOB_TTL:
+            del _jobs[job_id]
+
+    finished = sorted((j for j in _jobs.values() if j.finished), key=lambda j: j.finished_at)
+    overflow = len(_jobs) - MAX_JOBS
+    if overflow > 0:
+        for job in finished[:overflow]:
+            del _jobs[job.id]
+        finished = finished[overflow:]
+
+    # Oldest results go first once the kept results exceed the byte budget
+    total = sum(job.result_bytes for job in finished)
+    for job in finished:
+        if total <= JOB_RESULT_MAX_BYTES:
+            break
+        if job.result_bytes:
+            total -= job.result_bytes
+            job.result, job.result_bytes, job.result_expired = None, 0, True
+
+
+def _run(job: Job, work: Callable, args: tuple):
+    job._update(status=RUNNING)
+    try:
+        result = work(job.report, *args)
+    except Exception as e:
+        job._update(finished_at=time.time(), status=FAILED, error=str(e))
+        print(f"Job {job.kind} {job.id} failed: {e}")
+    else:
+        job._update(finished_at=time.time(), result=result, result_bytes=_payload_size(result), status=SUCCEEDED)
+        with _lock:
+            _evict(time.time())
+
+
+def submit_job(kind: str, work: Callable, *args) -> Job:
+    """
+    Run work(report, *args) on the job pool.
+
+    Args:
+        kind: Job type shown in status (e.g. "generate")
+        work: Function returning a JSON-serializable result; raise on failure
+        *args: Passed to work after report
+
+    Returns:
+        Job: queued job (poll get_job(job.id) or stream its events)
+    """
+    job = Job(kind)
+    with _lock:
+        _evict(time.time())
+        _jobs[job.id] = job
+    _pool.submit(_run, job, work, args)
+    return job
+
+
+def get_job(job_id: str) -> Optional[Job]:
+    """Return the job, or None if it does not exist or has expired."""
+    with _lock:
+        _evict(time.time())
+        return _jobs.get(job_id)
+
+
+def run_inline(work: Callable, *args):
+    """Run a job's work function in the calling thread, without progress reporting."""
+    return work(lambda stage, detail=None: None, *args)
@@ -0,0 +1,64 @@
+"""
+Memoized LLM extraction results.
+
+Campaign info extracted by the LLM is stored on disk keyed by a hash of
+the normalized page text, the prompt version and the model. As long as a
+deal page's content does not change, extract_campaign_info is a file read
+instead of a paid LLM call.
+
+Bump the prompt version (services/scraper.py EXTRACTION_PROMPT_VERSION)
+whenever the extraction prompt or output format changes.
+
+Environment:
+    LLM_CACHE_DIR        Cache directory (default .cache/llm, empty disables)
+    LLM_CACHE_TTL        Seconds a result stays valid (default 30 days)
+"""
+import os
+import re
+import hashlib
+from typing import Any, Dict, Optional
+
+from disk_cache import DiskCache
+
+LLM_CACHE_DIR = os.getenv("LLM_CACHE_DIR", ".cache/llm")
+LLM_CACHE_TTL = int(os.getenv("LLM_CACHE_TTL", str(30 * 24 * 3600)))
+LLM_CACHE_MAX_BYTES = 20 * 1024 * 1024
+
+_cache: Optional[DiskCache] = (
+    DiskCache(LLM_CACHE_DIR, LLM_CACHE_MAX_BYTES, ttl=LLM_CACHE_TTL) if LLM_CACHE_DIR else None
+)
+
+
+def normalize_text(text: str) -> str:
+    """Collapse whitespace so formatting-only changes do not miss the cache."""
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def llm_cache_key(text: str, model: str, prompt_version: str) -> str:
+    payload = f"{prompt_version}\0{model}\0{normalize_text(text)}"
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def get_cached_result(key: str) -> Optional[Dict[str, Any]]:
+    if _cache is None:
+        return None
+    try:
+        return _cache.get_json(key)
+    except ValueError:
+        return None
+
+
+def store_result(key: str, value: Dict[str, Any]):
+    if _cache is None:
+        return
+    try:
+        _cache.set_json(key, value)
+    except OSError as e:
+        print(f"LLM cache write failed: {e}")
+
+
+def llm_cache_info() -> Dict[str, Any]:
+    """LLM cache statistics: hits, misses, writes, evictions, entries, bytes."""
+    if _cache is None:
+        return {"enabled": False}
+    return {"enabled": True, "directory": LLM_CACHE_DIR, **_cache.stats()}
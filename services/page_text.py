@@ -0,0 +1,95 @@
+"""
+Token-budgeted page text for LLM prompts.
+
+Instead of cutting the page text at a fixed length (which keeps menus and
+legal boilerplate and drops the deal terms further down), the text is
+reduced in three steps:
+1. Repeated lines and known boilerplate (cookies, KVKK, copyright,
+   login/cart links) are removed.
+2. Each remaining line is scored: price / percentage patterns, headings
+   and deal-term keywords score high; very short menu-like lines are dropped.
+3. The best lines are packed into the token budget and emitted in their
+   original page order.
+
+Tokens are estimated as characters / 4.
+
+Environment:
+    LLM_TEXT_TOKEN_BUDGET  Token budget for the page text (default 1000)
+"""
+import os
+import re
+from typing import Iterable, List, Optional, Tuple
+
+LLM_TEXT_TOKEN_BUDGET = int(os.getenv("LLM_TEXT_TOKEN_BUDGET", "1000"))
+CHARS_PER_TOKEN = 4
+
+_BOILERPLATE_RE = re.compile(
+    r"çerez|cookie|kvkk|kişisel veri|gizlilik|aydınlatma metni|tüm hakları saklıdır|all rights reserved|©|"
+    r"copyright|giriş yap|üye ol|şifremi unuttum|sepete? |sepetim|uygulamayı indir|app store|google play|"
+    r"bizi takip edin|abone ol|bülten",
+    re.IGNORECASE,
+)
+_PRICE_RE = re.compile(r"\d[\d.,]*\s*(?:TL|₺)|%\s?\d{1,2}|\d{1,2}\s?%|indirim|fiyat", re.IGNORECASE)
+_TERMS_RE = re.compile(
+    r"geçerli|koşul|kullanım|rezervasyon|randevu|dahil|hariç|kişilik|kişi|saat|adres|menü|paket|seans",
+    re.IGNORECASE,
+)
+
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def _score(text: str, heading: bool, index: int) -> float:
+    score = 1.0
+    if heading:
+        score += 3
+    if _PRICE_RE.search(text):
+        score += 4
+    if _TERMS_RE.search(text):
+        score += 2
+    if len(text) < 12 and not heading:
+        # Menu items, buttons, breadcrumbs
+        score -= 1.5
+    # Earlier lines win ties
+    return score - index * 0.001
+
+
+def compress_page_text(blocks: Iterable[Tuple[str, bool]], token_budget: Optional[int] = None) -> str:
+    """
+    Reduce page text blocks to the most relevant lines within a token budget.
+
+    Args:
+        blocks: (text, is_heading) in page order
+        token_budget: Max tokens of the result (default LLM_TEXT_TOKEN_BUDGET)
+
+    Returns:
+        Selected lines joined by newlines, in page order
+    """
+    token_budget = token_budget or LLM_TEXT_TOKEN_BUDGET
+
+    lines: List[Tuple[str, bool]] = []
+    seen = set()
+    for text, heading in blocks:
+        text = " ".join(text.split())
+        key = text.lower()
+        if not text or key in seen or _BOILERPLATE_RE.search(text):
+            continue
+        seen.add(key)
+        lines.append((text, heading))
+
+    scores = [_score(text, heading, i) for i, (text, heading) in enumerate(lines)]
+    # Menu-like lines are dropped even when there is room left
+    ranked = sorted((i for i in range(len(lines)) if scores[i] > 0), key=scores.__getitem__, reverse=True)
+
+    budget_chars = token_budget * CHARS_PER_TOKEN
+    used = 0
+    selected = []
+    for i in ranked:
+        cost = len(lines[i][0]) + 1
+        if used + cost > budget_chars:
+            continue
+        selected.append(i)
+        used += cost
+
+    return "\n".join(lines[i][0] for i in sorted(selected))
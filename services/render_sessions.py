@@ -0,0 +1,101 @@
+"""
+Server-side render sessions for interactive poster adjustments.
+
+A session keeps the decoded, resized and gradient-composited poster
+background in memory, so /adjust-poster only has to draw text on a copy
+instead of receiving, decoding and resizing the raw image on every change.
+"""
+import time
+import uuid
+import threading
+
+from image_loader import resize_to
+from layout import PREVIEW_SCALE, scaled_size
+from poster import (
+    SIZE,
+    prepare_poster_background,
+    render_poster_text,
+    prepare_multi_poster_background,
+    render_multi_poster_text,
+    encode_poster,
+)
+
+# Idle sessions are dropped after this many seconds
+SESSION_TTL = 30 * 60
+# Upper bound on sessions kept in memory (~4MB each)
+MAX_SESSIONS = 32
+
+_sessions = {}
+_lock = threading.Lock()
+
+
+def _evict(now):
+    """Drop expired sessions, then the least recently used ones over MAX_SESSIONS."""
+    for session_id, session in list(_sessions.items()):
+        if now - session["last_used"] > SESSION_TTL:
+            del _sessions[session_id]
+
+    overflow = len(_sessions) - MAX_SESSIONS
+    if overflow > 0:
+        oldest = sorted(_sessions, key=lambda sid: _sessions[sid]["last_used"])
+        for session_id in oldest[:overflow]:
+            del _sessions[session_id]
+
+
+def create_session(raw_bytes, mode):
+    """
+    Prepare the poster background once and store it under a new session id.
+
+    Args:
+        raw_bytes: Raw (text-free) image bytes
+        mode: 'ai' (single image poster) or 'basic' (multi-image poster layout)
+
+    Returns:
+        str: Session id
+    """
+    if mode == "ai":
+        background = prepare_poster_background(raw_bytes)
+    else:
+        background = prepare_multi_poster_background([raw_bytes])
+
+    session_id = uuid.uuid4().hex
+    now = time.time()
+    with _lock:
+        _evict(now)
+        _sessions[session_id] = {
+            "mode": mode,
+            "background": background,
+            "last_used": now,
+        }
+    return session_id
+
+
+def get_session(session_id):
+    """Return the session dict, or None if it does not exist or has expired."""
+    now = time.time()
+    with _lock:
+        _evict(now)
+        session = _sessions.get(session_id)
+        if session:
+            session["last_used"] = now
+        return session
+
+
+def render_session(session, title, discount, title_y_percent, preview=False):
+    """
+    Draw text on the session's prepared background and return the EncodeResult
+    (encoded bytes and the chosen encoder settings).
+    preview=True renders at PREVIEW_SCALE with the "preview" encoder preset;
+    the downscaled background is built once per session.
+    """
+    background = session["background"]
+    if preview:
+        if "preview_background" not in session:
+            session["preview_background"] = resize_to(background, scaled_size(SIZE, PREVIEW_SCALE))
+        background = session["preview_background"]
+
+    if session["mode"] == "ai":
+        poster = render_poster_text(background, title, discount, title_y_percent)
+    else:
+        poster = render_multi_poster_text(background, title, discount, title_y_percent)
+    return encode_poster(poster, "preview" if preview else "publish")
@@ -1,38 +1,496 @@
+import re
 import json
-import requests
-import fal_client
-from bs4 import BeautifulSoup
+from html.parser import HTMLParser
+from typing import List, Optional, Tuple
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+from services.http_cache import fetch_page
+from services import fal_gateway
+from services.page_text import compress_page_text, LLM_TEXT_TOKEN_BUDGET
+from services.llm_cache import llm_cache_key, get_cached_result, store_result
+
+try:
+    import lxml  # noqa: F401  (optional, much faster tree builder)
+    HTML_PARSER = "lxml"
+except ImportError:
+    HTML_PARSER = "html.parser"
+
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+}
+
+# Raw page text scanned before it is reduced to the LLM token budget
+MAX_BODY_CHARS = 20000
+# Bump when PageSnapshot.parse output changes, so cached snapshots are re-parsed
+SNAPSHOT_VERSION = "4"
+
+# Default extraction model; bump the prompt version when the prompt changes
+EXTRACTION_MODEL = "openai/gpt-4o-mini"
+EXTRACTION_PROMPT_VERSION = "1"
+
+# Only these tags are built into the soup; the rest of the page is skipped
+_HEAD_STRAINER = SoupStrainer(["title", "meta", "img"])
+# Price / discount elements picked up while streaming the body
+_PRICE_ITEMPROPS = {"price", "lowprice", "discount"}
+_PRICE_CLASS_RE = re.compile(r"price|discount|indirim|fiyat", re.IGNORECASE)
+_MAX_PRICE_TEXTS = 10
+# Related-deal cards and sidebars: their prices belong to other campaigns
+_RELATED_BLOCK_RE = re.compile(
+    r"related|similar|recommend|sidebar|carousel|benzer|ilgili|öneri|oneri|diger|diğer", re.IGNORECASE
+)
+# The main deal block; when present, only its price elements are kept
+_MAIN_TAGS = {"main", "article"}
+# Subtrees left out of the page text
+_SKIPPED_TAGS = {"script", "style", "nav", "footer", "header"}
+_HEADING_TAGS = {"h1", "h2", "h3"}
+# HTML fed to the text collector per step, so it can stop early
+_FEED_CHUNK = 16 * 1024
+
+
+class _BodyCollector(HTMLParser):
+    """
+    Streaming pass over the page body, stopping at max_chars of text:
+    - blocks: (stripped text node, inside h1-h3) outside skipped tags;
+      text() joins them by newlines (like get_text(separator="\n",
+      strip=True) after removing the skipped tags)
+    - json_ld: raw <script type="application/ld+json"> blocks
+    - price_texts: text of price/discount elements (itemprop or class) in
+      the main deal block: never inside <aside> or related-deal / sidebar
+      containers, and only inside <main>/<article> when the page has one
+    """
+
+    def __init__(self, max_chars: int):
+        super().__init__(convert_charrefs=True)
+        self.max_chars = max_chars
+        self.blocks = []
+        self.length = 0
+        self.skip_depth = 0
+        self.heading_depth = 0
+        self.json_ld = []
+        self.main_price_texts = []
+        self.other_price_texts = []
+        self.main_depth = 0
+        self._related_tag = None
+        self._related_depth = 0
+        self._in_json_ld = False
+        self._price_pending = False
+
+    @property
+    def price_texts(self) -> list:
+        return (self.main_price_texts or self.other_price_texts)[:_MAX_PRICE_TEXTS]
+
+    @property
+    def done(self) -> bool:
+        return self.length >= self.max_chars
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == "script" and (attrs.get("type") or "").lower() == "application/ld+json":
+            self._in_json_ld = True
+        if tag in _SKIPPED_TAGS:
+            self.skip_depth += 1
+        if tag in _HEADING_TAGS:
+            self.heading_depth += 1
+        if tag in _MAIN_TAGS:
+            self.main_depth += 1
+
+        # Nesting of the related block's own tag, so its end tag is found
+        if self._related_tag:
+            if tag == self._related_tag:
+                self._related_depth += 1
+            return
+        if _is_related_block(tag, attrs):
+            self._related_tag, self._related_depth = tag, 1
+            return
+
+        if _is_price_element(attrs):
+            if attrs.get("content"):
+                self._add_price_text(attrs["content"].strip())
+            else:
+                self._price_pending = True
+
+    def handle_endtag(self, tag):
+        if tag == "script":
+            self._in_json_ld = False
+        if tag in _SKIPPED_TAGS and self.skip_depth:
+            self.skip_depth -= 1
+        if tag in _HEADING_TAGS and self.heading_depth:
+            self.heading_depth -= 1
+        if tag in _MAIN_TAGS and self.main_depth:
+            self.main_depth -= 1
+        if tag == self._related_tag:
+            self._related_depth -= 1
+            if not self._related_depth:
+                self._related_tag = None
+
+    def _add_price_text(self, text: str):
+        texts = self.main_price_texts if self.main_depth else self.other_price_texts
+        if len(texts) < _MAX_PRICE_TEXTS:
+            texts.append(text)
+
+    def handle_data(self, data):
+        if self._in_json_ld:
+            self.json_ld.append(data)
+            return
+        if self.skip_depth or self.done:
+            return
+        text = data.strip()
+        if text:
+            if self._price_pending:
+                self._add_price_text(text)
+                self._price_pending = False
+            self.length += len(text) + (1 if self.blocks else 0)
+            self.blocks.append((text, self.heading_depth > 0))
+
+    def text(self) -> str:
+        return "\n".join(text for text, _ in self.blocks)[:self.max_chars]
+
+
+def _is_price_element(attrs: dict) -> bool:
+    if (attrs.get("itemprop") or "").lower() in _PRICE_ITEMPROPS:
+        return True
+    return bool(_PRICE_CLASS_RE.search(attrs.get("class") or ""))
+
+
+def _is_related_block(tag: str, attrs: dict) -> bool:
+    if tag == "aside":
+        return True
+    return bool(_RELATED_BLOCK_RE.search(f"{attrs.get('class') or ''} {attrs.get('id') or ''}"))
+
+
+def _collect_body(html: str, max_chars: int = MAX_BODY_CHARS) -> _BodyCollector:
+    collector = _BodyCollector(max_chars)
+    for start in range(0, len(html), _FEED_CHUNK):
+        collector.feed(html[start:start + _FEED_CHUNK])
+        if collector.done:
+            break
+    else:
+        collector.close()
+    return collector
+
+
+def extract_body_text(html: str, max_chars: int = MAX_BODY_CHARS) -> str:
+    """Page text without script/style/nav/header/footer, parsed only until max_chars are collected."""
+    return _collect_body(html, max_chars).text()
+
+
+def _parse_json_ld(blocks: List[str]) -> List[dict]:
+    """JSON-LD objects from raw script blocks, with @graph and lists flattened."""
+    objects = []
+
+    def walk(value):
+        if isinstance(value, list):
+            for item in value:
+                walk(item)
+        elif isinstance(value, dict):
+            objects.append(value)
+            if "@graph" in value:
+                walk(value["@graph"])
+
+    for block in blocks:
+        try:
+            walk(json.loads(block))
+        except ValueError:
+            continue
+    return objects
+
+
+class PageSnapshot:
+    """
+    A campaign page fetched and parsed once.
+
+    Text content, meta description and campaign image candidates are all
+    derived from the same download, so callers that need several of them do
+    not fetch the page again. Only <title>, <meta> and <img> are built into
+    a soup (SoupStrainer, lxml when installed); the body text is streamed
+    through a lightweight parser that stops at MAX_BODY_CHARS and reduced
+    to the LLM token budget (services/page_text.py).
+
+    fetch() goes through the conditional-GET cache (services/http_cache.py):
+    an unchanged page is a 304 and its stored snapshot is reused as is.
+    """
+
+    def __init__(self, url: str, title: str, meta_description: str, body_text: str,
+                 image_candidates: List[str], structured: Optional[dict] = None):
+        self.url = url
+        self.title = title
+        self.meta_description = meta_description
+        self.body_text = body_text
+        self._image_candidates = image_candidates
+        # json_ld objects, og:/product: meta tags and price element texts
+        self.structured = structured or {"json_ld": [], "meta": {}, "price_texts": []}
+
+    @classmethod
+    def parse(cls, url: str, html: str) -> "PageSnapshot":
+        soup = BeautifulSoup(html, HTML_PARSER, parse_only=_HEAD_STRAINER)
+
+        title_tag = soup.find("title")
+        title = title_tag.string.strip() if title_tag and title_tag.string else ""
+
+        meta_desc = ""
+        meta_tag = soup.find("meta", attrs={"name": "description"})
+        if meta_tag and meta_tag.get("content"):
+            meta_desc = meta_tag["content"].strip()
+
+        structured_meta = {}
+        for tag in soup.find_all("meta"):
+            key = (tag.get("property") or tag.get("name") or "").lower()
+            if key.startswith(("og:", "product:")) and tag.get("content"):
+                structured_meta.setdefault(key, tag["content"].strip())
+
+        body = _collect_body(html)
+        structured = {
+            "json_ld": _parse_json_ld(body.json_ld),
+            "meta": structured_meta,
+            "price_texts": body.price_texts,
+        }
+        body_text = compress_page_text(body.blocks)
+        return cls(url, title, meta_desc, body_text, _deal_image_urls(soup, url), structured)
+
+    @classmethod
+    def fetch(cls, url: str) -> "PageSnapshot":
+        page = fetch_page(
+            url,
+            headers=HEADERS,
+            timeout=30,
+            parse=lambda html: cls.parse(url, html).to_dict(),
+            # body_text depends on the token budget, so a budget change re-parses
+            parse_version=f"{SNAPSHOT_VERSION}:{LLM_TEXT_TOKEN_BUDGET}",
+        )
+        return cls.from_dict(page.parsed)
+
+    def to_dict(self) -> dict:
+        return {
+            "url": self.url,
+            "title": self.title,
+            "meta_description": self.meta_description,
+            "body_text": self.body_text,
+            "image_candidates": self._image_candidates,
+            "structured": self.structured,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "PageSnapshot":
+        return cls(data["url"], data["title"], data["meta_description"], data["body_text"],
+                   data["image_candidates"], data.get("structured"))
+
+    @property
+    def text(self) -> str:
+        """Page content for the LLM: title, meta description and body text."""
+        return f"Sayfa Başlığı: {self.title}\nMeta Açıklama: {self.meta_description}\n\nSayfa İçeriği:\n{self.body_text}"
+
+    def image_urls(self, max_images: int = 3) -> List[str]:
+        """Campaign image URLs (grpstat.com/DealImages/), one per image, large sizes preferred."""
+        return self._image_candidates[:max_images]
+
+
+def _deal_image_urls(soup: BeautifulSoup, base_url: str) -> List[str]:
+    """
+    Grupanya campaign images are located under grpstat.com/DealImages/.
+    Thumbnails are skipped and only the first size of each image is kept.
+    """
+    image_urls = []
+    seen = set()
+
+    for img in soup.find_all("img"):
+        src = img.get("src") or img.get("data-src") or ""
+        if not src:
+            continue
+
+        # Convert to absolute URL
+        src = urljoin(base_url, src)
+
+        # Grupanya campaign images: grpstat.com/DealImages/
+        if "dealimages" not in src.lower():
+            continue
+
+        # Skip small thumbnails (e.g. 127-85)
+        if re.search(r'_\d{2,3}-\d{2,3}\.', src):
+            if "_127-85" in src or "_85-85" in src:
+                continue
+
+        # Prevent different sizes of the same image
+        # Base key: without size info
+        base_key = re.sub(r'_?\d{3,4}-\d{3,4}', '', src)
+        if base_key in seen:
+            continue
+        seen.add(base_key)
+
+        image_urls.append(src)
+
+    return image_urls
 
 
 def scrape_campaign_page(url: str) -> str:
     """Scrape campaign page and return text content."""
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-    }
-    resp = requests.get(url, headers=headers, timeout=30)
-    resp.raise_for_status()
+    return PageSnapshot.fetch(url).text
+
+
+CAMPAIGN_FIELDS = ("title", "category", "discount")
+
+# JSON-LD types that describe the deal itself
+_DEAL_TYPES = {"product", "offer", "aggregateoffer", "event", "service", "trip", "foodestablishment"}
+_PERCENT_RE = re.compile(r"%\s?(\d{1,2})\b|\b(\d{1,2})\s?%")
+_PRICE_RE = re.compile(r"(\d{1,3}(?:[.\s]\d{3})*(?:,\d{1,2})?|\d+(?:,\d{1,2})?)\s*(?:TL|₺)", re.IGNORECASE)
+
+
+def _json_ld_types(obj: dict) -> set:
+    types = obj.get("@type") or []
+    if isinstance(types, str):
+        types = [types]
+    return {t.lower() for t in types if isinstance(t, str)}
+
+
+def _format_try(amount) -> Optional[str]:
+    """Schema.org price (e.g. "2750.00") as Turkish formatted TL ("2.750 TL")."""
+    try:
+        value = float(str(amount).replace(",", "."))
+    except ValueError:
+        return None
+    if value <= 0:
+        return None
+    if value.is_integer():
+        number = f"{int(value):,}".replace(",", ".")
+    else:
+        number = f"{value:,.2f}".replace(",", "_").replace(".", ",").replace("_", ".")
+    return f"{number} TL"
+
+
+def _json_ld_offers(obj: dict) -> List[dict]:
+    if _json_ld_types(obj) & {"offer", "aggregateoffer"}:
+        return [obj]
+    offers = obj.get("offers")
+    offers = offers if isinstance(offers, list) else [offers]
+    return [offer for offer in offers if isinstance(offer, dict)]
+
+
+def _percent(text) -> Optional[str]:
+    match = _PERCENT_RE.search(text if isinstance(text, str) else "")
+    return f"%{match.group(1) or match.group(2)}" if match else None
+
+
+def _json_ld_percent(objects: List[dict]) -> Optional[str]:
+    """A percentage from the deal's offers (discount, name, description), then the deal itself."""
+    for obj in objects:
+        if not _json_ld_types(obj) & _DEAL_TYPES:
+            continue
+        for offer in _json_ld_offers(obj):
+            for key in ("discount", "name", "description"):
+                percent = _percent(offer.get(key))
+                if percent:
+                    return percent
+        for key in ("name", "description"):
+            percent = _percent(obj.get(key))
+            if percent:
+                return percent
+    return None
+
+
+def _json_ld_price(objects: List[dict]) -> Optional[str]:
+    for obj in objects:
+        for offer in _json_ld_offers(obj):
+            currency = (offer.get("priceCurrency") or "TRY").upper()
+            if currency not in ("TRY", "TL"):
+                continue
+            if offer.get("price") is not None:
+                price = _format_try(offer["price"])
+                if price:
+                    return price
+            if offer.get("lowPrice") is not None:
+                price = _format_try(offer["lowPrice"])
+                if price:
+                    return f"{price}'den başlayan fiyatlarla"
+    return None
+
+
+def extract_structured_fields(page: "PageSnapshot") -> dict:
+    """
+    Campaign fields readable without a model: title and discount from
+    JSON-LD, OpenGraph / product meta tags and price elements.
+    The English visual category is never available here.
+    """
+    structured = page.structured
+    objects = structured["json_ld"]
+    meta = structured["meta"]
+    price_texts = structured["price_texts"]
+    fields = {}
+
+    deal = next((o for o in objects if _json_ld_types(o) & _DEAL_TYPES and o.get("name")), None)
+    title = (deal or {}).get("name") or meta.get("og:title")
+    if isinstance(title, str) and title.strip():
+        fields["title"] = title.strip()
+
+    # Discount: a percentage first, otherwise the price. The deal's own
+    # JSON-LD and meta tags come before the page's price elements.
+    percent = _json_ld_percent(objects)
+    for text in [meta.get("og:title"), meta.get("og:description"), page.title] + price_texts:
+        if percent:
+            break
+        percent = _percent(text)
+    if percent:
+        fields["discount"] = percent
+    else:
+        price = (
+            _json_ld_price(objects)
+            or _format_try(meta.get("product:price:amount") or meta.get("og:price:amount") or "")
+        )
+        for text in ([] if price else price_texts):
+            match = _PRICE_RE.search(text)
+            if match:
+                price = f"{match.group(1)} TL"
+            elif re.fullmatch(r"\d+(?:\.\d{1,2})?", text):
+                # itemprop content: schema.org number format
+                price = _format_try(text)
+            if price:
+                break
+        if price:
+            fields["discount"] = price
+
+    return fields
+
 
-    soup = BeautifulSoup(resp.text, "html.parser")
+def extract_campaign(page: "PageSnapshot", known: Optional[dict] = None,
+                     model: str = EXTRACTION_MODEL) -> Tuple[dict, str]:
+    """
+    Campaign info from a page: structured data first, the LLM only for
+    fields that are still missing (usually the English category).
 
-    for tag in soup(["script", "style", "nav", "footer", "header"]):
-        tag.decompose()
+    Args:
+        page: Fetched page snapshot
+        known: Fields already known (e.g. a refreshed campaign's category);
+               used when the page has no structured value for them
+        model: LLM model for the missing fields
 
-    title = soup.title.string.strip() if soup.title and soup.title.string else ""
+    Returns:
+        (info, path): info has title, category and discount; path is
+        "structured", "llm" or "structured+llm"
+    """
+    structured = extract_structured_fields(page)
+    info = {k: v for k, v in (known or {}).items() if k in CAMPAIGN_FIELDS and v}
+    info.update(structured)
 
-    meta_desc = ""
-    meta_tag = soup.find("meta", attrs={"name": "description"})
-    if meta_tag and meta_tag.get("content"):
-        meta_desc = meta_tag["content"].strip()
+    missing = [field for field in CAMPAIGN_FIELDS if not info.get(field)]
+    if not missing:
+        return info, "structured"
 
-    body_text = soup.get_text(separator="\n", strip=True)
-    if len(body_text) > 4000:
-        body_text = body_text[:4000]
+    llm_info = extract_campaign_info(page.text, model=model)
+    for field in missing:
+        info[field] = llm_info.get(field, "")
+    return info, ("structured+llm" if len(missing) < len(CAMPAIGN_FIELDS) else "llm")
 
-    return f"Sayfa Başlığı: {title}\nMeta Açıklama: {meta_desc}\n\nSayfa İçeriği:\n{body_text}"
 
+def extract_campaign_info(page_content: str, model: str = EXTRACTION_MODEL) -> dict:
+    """
+    Extract campaign info (title, category, discount) from page content using AI.
+    Results are memoized per (page content, prompt version, model).
+    """
+    key = llm_cache_key(page_content, model, EXTRACTION_PROMPT_VERSION)
+    cached = get_cached_result(key)
+    if cached:
+        return cached
 
-def extract_campaign_info(page_content: str) -> dict:
-    """Extract campaign info from page content using AI."""
     system_prompt = """Sen bir kampanya analiz asistanısın. Sana verilen web sayfası içeriğinden kampanya bilgilerini çıkarmalısın.
 
 Yanıtını SADECE aşağıdaki JSON formatında ver, başka hiçbir şey yazma:
@@ -44,10 +502,10 @@ Yanıtını SADECE aşağıdaki JSON formatında ver, başka hiçbir şey yazma:
 
     user_prompt = f"Aşağıdaki kampanya sayfasının içeriğini analiz et ve kampanya bilgilerini JSON olarak çıkar:\n\n{page_content}"
 
-    result = fal_client.subscribe(
+    result = fal_gateway.run(
         "fal-ai/any-llm",
         arguments={
-            "model": "openai/gpt-4o-mini",
+            "model": model,
             "prompt": user_prompt,
             "system_prompt": system_prompt,
         },
@@ -66,4 +524,6 @@ Yanıtını SADECE aşağıdaki JSON formatında ver, başka hiçbir şey yazma:
     if start != -1 and end > start:
         json_str = json_str[start:end]
 
-    return json.loads(json_str)
+    info = json.loads(json_str)
+    store_result(key, info)
+    return info
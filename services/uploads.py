@@ -0,0 +1,152 @@
+"""
+In-memory uploads to fal.ai storage.
+
+Rendered posters, collages, reference photos and dashboard uploads are
+sent straight from memory (or from the Werkzeug upload stream) with
+fal_client.upload, instead of being written to a temp file for
+fal_client.upload_file and deleted again.
+
+The content type is taken from the caller when known, otherwise sniffed
+from the image signature, then from the upload's mimetype / file name.
+
+Uploads are deduplicated by content: the SHA-256 of the bytes maps to
+the returned URL on disk, so re-publishing the same poster, re-uploading
+the same files or adjusting a poster back to an earlier value returns
+the cached URL without any network I/O. Keep UPLOAD_CACHE_TTL below the
+fal storage retention so a cached URL never points at a deleted file.
+
+Environment:
+    UPLOAD_WORKERS      Concurrent uploads in upload_many (default 4)
+    UPLOAD_CACHE_DIR    URL cache directory (default .cache/uploads, empty disables)
+    UPLOAD_CACHE_TTL    Seconds a cached URL is reused (default 7 days)
+"""
+import os
+import hashlib
+import mimetypes
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, BinaryIO, Dict, List, Optional, Union
+
+import fal_client
+
+from disk_cache import DiskCache
+from services.image_fetcher import sniff_image_type
+
+UPLOAD_WORKERS = int(os.getenv("UPLOAD_WORKERS", "4"))
+DEFAULT_CONTENT_TYPE = "application/octet-stream"
+
+UPLOAD_CACHE_DIR = os.getenv("UPLOAD_CACHE_DIR", ".cache/uploads")
+UPLOAD_CACHE_TTL = int(os.getenv("UPLOAD_CACHE_TTL", str(7 * 24 * 3600)))
+UPLOAD_CACHE_MAX_BYTES = 10 * 1024 * 1024
+
+_cache: Optional[DiskCache] = (
+    DiskCache(UPLOAD_CACHE_DIR, UPLOAD_CACHE_MAX_BYTES, ttl=UPLOAD_CACHE_TTL) if UPLOAD_CACHE_DIR else None
+)
+
+
+def guess_content_type(data: bytes, file_name: Optional[str] = None, fallback: Optional[str] = None) -> str:
+    """Image type from magic bytes, then fallback (e.g. upload mimetype), then file extension."""
+    image_type = sniff_image_type(data[:16])
+    if image_type:
+        return f"image/{image_type}"
+    if fallback and fallback != DEFAULT_CONTENT_TYPE:
+        return fallback
+    if file_name:
+        guessed, _ = mimetypes.guess_type(file_name)
+        if guessed:
+            return guessed
+    return DEFAULT_CONTENT_TYPE
+
+
+def _upload(data: bytes, content_type: str, file_name: Optional[str]) -> str:
+    """fal_client.upload, skipped when the same bytes were uploaded before."""
+    key = hashlib.sha256(data).hexdigest()
+    if _cache is not None:
+        try:
+            cached = _cache.get_json(key)
+        except ValueError:
+            cached = None
+        if cached and cached.get("content_type") == content_type:
+            return cached["url"]
+
+    url = fal_client.upload(data, content_type, file_name)
+
+    if _cache is not None:
+        try:
+            _cache.set_json(key, {"url": url, "content_type": content_type})
+        except OSError as e:
+            print(f"Upload cache write failed: {e}")
+    return url
+
+
+def upload_bytes(data: bytes, content_type: Optional[str] = None, file_name: Optional[str] = None) -> str:
+    """
+    Upload bytes to fal.ai storage.
+
+    Args:
+        data: File contents
+        content_type: MIME type (sniffed when omitted)
+        file_name: Optional name, used for the type guess and large uploads
+
+    Returns:
+        str: Public URL
+    """
+    content_type = content_type or guess_content_type(data, file_name)
+    return _upload(data, content_type, file_name)
+
+
+def upload_stream(stream: BinaryIO, content_type: Optional[str] = None, file_name: Optional[str] = None) -> str:
+    """
+    Upload a file-like object, e.g. a Werkzeug FileStorage from request.files.
+
+    The upload's own mimetype and filename are used when not given.
+    """
+    file_name = file_name or getattr(stream, "filename", None)
+    data = stream.read()
+    if not content_type:
+        content_type = guess_content_type(data, file_name, getattr(stream, "mimetype", None))
+    return _upload(data, content_type, file_name)
+
+
+def upload_many(
+    items: List[Union[bytes, BinaryIO]],
+    content_type: Optional[str] = None,
+    max_workers: Optional[int] = None,
+) -> List[str]:
+    """
+    Upload several byte strings / streams concurrently.
+
+    Returns:
+        list of URLs in the order of items (the first failure is raised)
+    """
+    if not items:
+        return []
+
+    # Identical items in one batch are uploaded once
+    uploads: Dict[str, tuple] = {}
+    keys = []
+    for item in items:
+        if isinstance(item, (bytes, bytearray)):
+            data, file_name, mimetype = bytes(item), None, None
+        else:
+            data = item.read()
+            file_name, mimetype = getattr(item, "filename", None), getattr(item, "mimetype", None)
+        item_type = content_type or guess_content_type(data, file_name, mimetype)
+        key = hashlib.sha256(data).hexdigest() + item_type
+        uploads.setdefault(key, (data, item_type, file_name))
+        keys.append(key)
+
+    workers = min(max_workers or UPLOAD_WORKERS, len(uploads))
+    if workers <= 1:
+        urls = [_upload(*args) for args in uploads.values()]
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            urls = list(pool.map(lambda args: _upload(*args), uploads.values()))
+    url_by_key = dict(zip(uploads, urls))
+    return [url_by_key[key] for key in keys]
+
+
+def upload_cache_info() -> Dict[str, Any]:
+    """Upload cache statistics: hits, misses, writes, evictions, entries, bytes."""
+    if _cache is None:
+        return {"enabled": False}
+    return {"enabled": True, "directory": UPLOAD_CACHE_DIR, "ttl": UPLOAD_CACHE_TTL, **_cache.stats()}
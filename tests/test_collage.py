@@ -0,0 +1,29 @@
+"""create_collage error handling."""
+import os
+from io import BytesIO
+
+import pytest
+from PIL import Image
+
+# Render for real instead of serving earlier results from .cache/renders
+os.environ["RENDER_CACHE_DIR"] = ""
+
+from collage import create_collage
+
+
+def _encode(img, fmt="PNG"):
+    buf = BytesIO()
+    img.save(buf, fmt)
+    return buf.getvalue()
+
+
+def test_collage_skips_image_that_fails_to_decode():
+    good = _encode(Image.new("RGB", (800, 600), (0, 120, 0)), "JPEG")
+    truncated = good[: len(good) // 3]
+    assert create_collage([good, truncated, good], layout="grid", gap=3)
+
+
+def test_collage_fails_when_no_image_decodes():
+    good = _encode(Image.new("RGB", (800, 600), (0, 120, 0)), "PNG")
+    with pytest.raises(ValueError):
+        create_collage([good[:200], good[:300]], layout="grid", gap=3)
@@ -0,0 +1,61 @@
+"""Regression tests for image_loader with non-RGB source modes."""
+import os
+from io import BytesIO
+
+import pytest
+from PIL import Image
+
+# Render for real instead of serving earlier results from .cache/renders
+os.environ["RENDER_CACHE_DIR"] = ""
+
+from image_loader import load_image, load_fitted
+from collage import create_collage
+from poster import create_poster_from_multiple
+
+
+def _encode(img, fmt="PNG"):
+    buf = BytesIO()
+    img.save(buf, fmt)
+    return buf.getvalue()
+
+
+def _palette_png(size=(4000, 3000), transparent=False):
+    img = Image.new("RGB", size, (200, 30, 30)).quantize(colors=16)
+    if transparent:
+        img.info["transparency"] = 0
+    return _encode(img)
+
+
+@pytest.fixture(params=["P", "P-transparent", "1", "I;16", "GIF"])
+def large_source(request):
+    if request.param == "P":
+        return _palette_png()
+    if request.param == "P-transparent":
+        return _palette_png(transparent=True)
+    if request.param == "GIF":
+        return _encode(Image.new("RGB", (3000, 2000), (0, 90, 200)).convert("P"), "GIF")
+    return _encode(Image.new(request.param, (3000, 2000), 1))
+
+
+def test_load_image_reduces_any_mode(large_source):
+    img = load_image(large_source, target_size=(500, 500))
+    assert img.mode == "RGB"
+    assert img.width < 3000
+
+
+def test_load_image_keeps_alpha_when_not_flattening():
+    img = load_image(_palette_png(transparent=True), target_size=(500, 500), flatten=False)
+    assert img.mode == "RGBA"
+
+
+def test_load_fitted_any_mode(large_source):
+    img = load_fitted(large_source, (400, 300))
+    assert img.size == (400, 300)
+    assert img.mode == "RGB"
+
+
+def test_collage_and_poster_accept_palette_sources(large_source):
+    sources = [large_source, _palette_png()]
+    assert create_collage(sources, layout="feature", gap=3)
+    assert create_poster_from_multiple(sources, "Test", "%50")
+
@@ -0,0 +1,47 @@
+"""Structured campaign fields read without the LLM."""
+from services.scraper import PageSnapshot, extract_structured_fields
+
+RELATED_SIDEBAR = """
+<aside class="related-deals">
+  <div class="deal-card"><span class="discount">%70 indirim</span></div>
+</aside>
+"""
+
+
+def _page(body, head=""):
+    html = f"<html><head><title>Yaz kampanyası</title>{head}</head><body>{body}</body></html>"
+    return PageSnapshot.parse("https://example.com/kampanya", html)
+
+
+def test_related_sidebar_percentage_is_not_the_discount():
+    page = _page(
+        RELATED_SIDEBAR + '<main><h1>Otel fırsatı</h1><span class="discount">%40</span></main>',
+    )
+    assert page.structured["price_texts"] == ["%40"]
+    assert extract_structured_fields(page)["discount"] == "%40"
+
+
+def test_related_cards_outside_aside_are_skipped():
+    page = _page(
+        '<div class="price">%25</div>'
+        '<section id="similar-campaigns"><div><p class="price">%60</p></div></section>'
+    )
+    assert page.structured["price_texts"] == ["%25"]
+
+
+def test_deal_meta_percentage_comes_before_price_elements():
+    page = _page(
+        RELATED_SIDEBAR + '<div class="price">%15</div>',
+        head='<meta property="og:title" content="Tüm otellerde %30 indirim">',
+    )
+    assert extract_structured_fields(page)["discount"] == "%30"
+
+
+def test_json_ld_offer_percentage_comes_first():
+    json_ld = (
+        '<script type="application/ld+json">'
+        '{"@type": "Product", "name": "Otel", "offers": {"@type": "Offer", "description": "%35 indirim"}}'
+        "</script>"
+    )
+    page = _page(json_ld, head='<meta property="og:title" content="%20 indirim">')
+    assert extract_structured_fields(page)["discount"] == "%35"